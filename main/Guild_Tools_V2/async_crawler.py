@@ -0,0 +1,112 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import wow_crawler as wc
+
+# ────────────────────────────────────────────────
+# Settings
+# Max in-flight requests per API host
+HOST_CONCURRENCY = {
+    "blizzard": int(os.getenv("ASYNC_BLIZZARD_CONCURRENCY", "20")),
+    "raiderio": int(os.getenv("ASYNC_RAIDERIO_CONCURRENCY", "8")),
+    "wcl": int(os.getenv("ASYNC_WCL_CONCURRENCY", "8")),
+}
+
+# Which host each crawl part talks to
+PART_HOSTS = {"equipment": "blizzard", "spec": "blizzard", "rio": "raiderio", "wcl": "wcl"}
+
+# ────────────────────────────────────────────────
+# Async Crawl Engine
+class AsyncCrawlEngine:
+    """asyncio crawl engine: fans out every character's API calls concurrently.
+
+    The blocking fetch helpers from wow_crawler (and so the pooled HTTP client)
+    are reused as-is on a dedicated thread pool; WCL data comes from one
+    batched prefetch shared by all characters; per-host semaphores bound how
+    many calls are in flight against Blizzard, Raider.IO and WCL. Failed parts
+    are retried after an asyncio sleep, which holds no thread. Reports and
+    CSV rows are produced by the same CharacterCrawl as the thread engine,
+    so output is identical.
+    """
+
+    def __init__(self, host_concurrency=None):
+        self.host_concurrency = dict(HOST_CONCURRENCY if host_concurrency is None else host_concurrency)
+        self.semaphores = {}
+        self.executor = None
+        self.wcl_prefetch = None
+
+    async def _call(self, host, func, *args):
+        """Run a blocking fetch under the host's semaphore"""
+        loop = asyncio.get_running_loop()
+        async with self.semaphores[host]:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def _fetch_equipment_icons(self, crawl):
+        """Item icons for the character's equipment, fetched concurrently"""
+        token = await self._call("blizzard", wc.token_manager.get_token)
+        data = await self._call("blizzard", crawl.ctx.get_profile, "equipment") if token else None
+        if not data:
+            return None
+
+        item_ids = {item.get("item", {}).get("id", 0) for item in data.get("equipped_items", [])}
+        item_ids.discard(0)
+        item_ids = sorted(item_ids)
+        icon_urls = await asyncio.gather(*[
+            self._call("blizzard", wc.get_item_icon, item_id, token) for item_id in item_ids
+        ])
+        return dict(zip(item_ids, icon_urls))
+
+    async def _fetch_part(self, crawl, part):
+        """Fetch one crawl part under its host's semaphore"""
+        if part == "wcl" and crawl.attempts == 1 and self.wcl_prefetch is not None:
+            crawl.wcl_prefetch = await self.wcl_prefetch
+        icons = await self._fetch_equipment_icons(crawl) if part == "equipment" else None
+        await self._call(PART_HOSTS[part], crawl.fetch_part, part, icons)
+
+    async def crawl_character(self, crawl):
+        """Crawl all data for a single character, retrying only failed parts"""
+        try:
+            while True:
+                parts = crawl.begin_attempt()
+                await asyncio.gather(*[self._fetch_part(crawl, part) for part in parts])
+
+                if not crawl.needs_retry():
+                    break
+                wc.console.print(f"[warning]⚠ Retrying {crawl.character} ({', '.join(sorted(crawl.failed))})...[/warning]")
+                await asyncio.sleep(wc.retry_delay(crawl.attempts))
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, crawl.finish)
+        except Exception as e:
+            crawl.error = e
+            return wc.build_failure_result(crawl.row, e)
+
+    async def crawl_all(self, characters, on_result=None):
+        """Crawl every character concurrently; results keep input order.
+
+        on_result(row, complete, record) is called as each character finishes.
+        """
+        self.semaphores = {host: asyncio.Semaphore(limit) for host, limit in self.host_concurrency.items()}
+
+        async def run_one(row):
+            crawl = wc.CharacterCrawl(row)
+            result = await self.crawl_character(crawl)
+            if on_result:
+                on_result(result, crawl.complete, crawl.record)
+            return result
+
+        with ThreadPoolExecutor(max_workers=sum(self.host_concurrency.values()) + 1) as executor:
+            self.executor = executor
+            # Batched WCL queries run alongside the Blizzard / Raider.IO fan-out
+            self.wcl_prefetch = asyncio.ensure_future(self._call("wcl", wc.prefetch_wcl_data, characters))
+            try:
+                return await asyncio.gather(*[run_one(row) for row in characters])
+            finally:
+                self.wcl_prefetch = None
+                self.executor = None
+
+def crawl_all(characters, on_result=None, host_concurrency=None):
+    """Run the async engine to completion from synchronous code"""
+    engine = AsyncCrawlEngine(host_concurrency)
+    return asyncio.run(engine.crawl_all(characters, on_result))
@@ -0,0 +1,110 @@
+import os
+import json
+
+# ────────────────────────────────────────────────
+# Settings
+CRAWL_RESULTS_FILE = os.path.join("logs", "crawl_results.jsonl")
+
+# ────────────────────────────────────────────────
+# Formatting (same rounding as the detailed/*.md report)
+def _amount(value):
+    if value is None or value == "N/A":
+        return "N/A"
+    try:
+        return f"{float(value):,.1f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+def _number(value):
+    return float(_amount(value).replace(',', ''))
+
+def _boss_rankings(difficulty_data):
+    rankings = []
+    for encounter in difficulty_data.get('rankings', []) or []:
+        best_amount = encounter.get('bestAmount', 0)
+        total_kills = encounter.get('totalKills', 0)
+        try:
+            if not best_amount:
+                continue  # Shown as N/A in the report
+            rankings.append({
+                'boss': encounter.get('encounter', {}).get('name', 'Unknown'),
+                'rank_percent': _amount(encounter.get('rankPercent', 0)),
+                'best_amount': int(round(float(best_amount))),
+                'total_kills': int(total_kills)
+            })
+        except (TypeError, ValueError):
+            pass
+    return rankings
+
+def summarize_wcl(wcl_data):
+    """WCL summary in the shape report_cache.parse_wcl_from_markdown returns"""
+    wcl_data = wcl_data if isinstance(wcl_data, dict) else {}
+    summary = {
+        'has_logs': True,  # The report always has Mythic/Heroic sections
+        'mythic': {'best_performance': 'N/A', 'boss_rankings': []},
+        'heroic': {'best_performance': 'N/A', 'boss_rankings': []},
+        'all_stars': []
+    }
+
+    for difficulty in ('mythic', 'heroic'):
+        difficulty_data = wcl_data.get(difficulty) or {}
+        if not difficulty_data:
+            continue
+        best_perf = difficulty_data.get('bestPerformanceAverage')
+        if best_perf:
+            summary[difficulty]['best_performance'] = _amount(best_perf)
+        summary[difficulty]['boss_rankings'] = _boss_rankings(difficulty_data)
+
+    for star in (wcl_data.get('mythic') or {}).get('allStars', []) or []:
+        try:
+            summary['all_stars'].append({
+                'partition': str(star.get('partition', 'N/A')),
+                'spec': star.get('spec', 'Unknown'),
+                'points': _number(star.get('points', 0)),
+                'possible': _number(star.get('possiblePoints', 0)),
+                'rank_percent': _number(star.get('rankPercent', 0))
+            })
+        except (TypeError, ValueError):
+            pass
+
+    return summary
+
+# ────────────────────────────────────────────────
+# Read / Write
+def build_record(character, character_class, role, server, spec, spec_icon, equipment_data, ilvl, mplus_score, wcl_data):
+    """Structured per-character crawl result (the detailed/*.md report is a view of this)"""
+    return {
+        'name': character,
+        'class': character_class,
+        'role': role,
+        'server': server,
+        'spec': spec,
+        'spec_icon': spec_icon,
+        'ilvl': ilvl,
+        'mplus': mplus_score,
+        'equipment': equipment_data or [],
+        'wcl': summarize_wcl(wcl_data)
+    }
+
+def write_crawl_results(records, path=CRAWL_RESULTS_FILE):
+    """Write one JSON record per line, atomically"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+def load_crawl_results(path=CRAWL_RESULTS_FILE):
+    """Load records from the last crawl; {name: record} ({} if missing)"""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record['name']] = record
+    return records
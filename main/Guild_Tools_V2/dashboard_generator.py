@@ -1,7 +1,23 @@
 import csv
 import os
+import re
 import json
+import hashlib
+import argparse
+import itertools
+import time
+import tracemalloc
 from datetime import datetime
+from crawl_results import load_crawl_results
+from report_cache import report_cache
+from mplus_store import iter_mplus_by_score, MPLUS_RUNS_DB_FILE, MplusRunStore
+
+# ────────────────────────────────────────────────
+# Settings
+# Write each character's details to its own pre-rendered file, loaded when the modal opens
+DASHBOARD_SPLIT_DETAILS = os.getenv("DASHBOARD_SPLIT_DETAILS", "false").lower() == "true"
+# Measure peak memory of the render with tracemalloc (slows the render down, so off by default)
+DASHBOARD_PROFILE_MEMORY = os.getenv("DASHBOARD_PROFILE_MEMORY", "false").lower() == "true"
 
 # Complete Raid buff mapping - 13 essential buffs
 RAID_BUFFS = {
@@ -71,73 +87,6 @@ RAID_BUFFS = {
         'icon': 'https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_strangulate.jpg'
     }
 }
-def parse_wcl_from_markdown(content):
-    """Extract WCL data from markdown content"""
-    wcl_data = {
-        'has_logs': False,
-        'best_performance': 'N/A',
-        'boss_rankings': [],
-        'all_stars': []
-    }
-    
-    lines = content.split('\n')
-    in_wcl_section = False
-    in_boss_table = False
-    in_allstars_table = False
-    
-    for i, line in enumerate(lines):
-        if '## 🏆 WarcraftLogs Performance' in line:
-            in_wcl_section = True
-            # Check next line for "No raid logs"
-            if i + 1 < len(lines) and 'No raid logs' in lines[i + 1]:
-                return wcl_data
-            wcl_data['has_logs'] = True
-        
-        if in_wcl_section:
-            if 'Best Performance Average:' in line:
-                try:
-                    wcl_data['best_performance'] = line.split('**')[1].strip()
-                except:
-                    pass
-            
-            if '### 📋 Boss Rankings' in line:
-                in_boss_table = True
-                continue
-            
-            if '### ⭐ All Stars Points' in line:
-                in_boss_table = False
-                in_allstars_table = True
-                continue
-            
-            if in_boss_table and line.startswith('|') and '---' not in line:
-                parts = [p.strip() for p in line.split('|')[1:-1]]
-                if len(parts) >= 4 and parts[0] not in ['Boss', '']:
-                    try:
-                        wcl_data['boss_rankings'].append({
-                            'boss': parts[0],
-                            'rank_percent': parts[1].replace('%', '').strip(),
-                            'best_amount': int(parts[2].replace(',', '')),
-                            'total_kills': int(parts[3])
-                        })
-                    except:
-                        pass
-            
-            if in_allstars_table and line.startswith('|') and '---' not in line:
-                parts = [p.strip() for p in line.split('|')[1:-1]]
-                if len(parts) >= 5 and parts[0] not in ['Partition', '']:
-                    try:
-                        wcl_data['all_stars'].append({
-                            'partition': parts[0],
-                            'spec': parts[1],
-                            'points': float(parts[2].replace(',', '')),
-                            'possible': float(parts[3].replace(',', '')),
-                            'rank_percent': float(parts[4].replace('%', '').strip())
-                        })
-                    except:
-                        pass
-    
-    return wcl_data
-
 def get_rio_color(score):
     """Get Raider.IO color based on score"""
     if score >= 3500: return '#ff8000'  # Orange
@@ -147,90 +96,6 @@ def get_rio_color(score):
     elif score >= 1500: return '#ffffff'  # Common White
     else: return '#808080'  # Gray
 
-def parse_wcl_from_markdown(content):
-    """Extract WCL data from markdown content for both difficulties"""
-    wcl_data = {
-        'has_logs': False,
-        'mythic': {
-            'best_performance': 'N/A',
-            'boss_rankings': []
-        },
-        'heroic': {
-            'best_performance': 'N/A',
-            'boss_rankings': []
-        },
-        'all_stars': []
-    }
-    
-    lines = content.split('\n')
-    current_difficulty = None
-    in_boss_table = False
-    in_allstars_table = False
-    
-    for i, line in enumerate(lines):
-        # Check for Mythic section
-        if '## 🏆 WarcraftLogs Performance - Mythic' in line:
-            current_difficulty = 'mythic'
-            wcl_data['has_logs'] = True
-            continue
-        
-        # Check for Heroic section
-        if '## 🏆 WarcraftLogs Performance - Heroic' in line:
-            current_difficulty = 'heroic'
-            wcl_data['has_logs'] = True
-            continue
-        
-        # Check for All Stars (goes in main section)
-        if '## ⭐ All Stars Points' in line:
-            current_difficulty = None
-            in_allstars_table = True
-            in_boss_table = False
-            continue
-        
-        if current_difficulty:
-            if 'Best Performance Average:' in line:
-                try:
-                    wcl_data[current_difficulty]['best_performance'] = line.split('**')[1].strip()
-                except:
-                    pass
-            
-            if '### 📋 Boss Rankings' in line:
-                in_boss_table = True
-                continue
-            
-            if in_boss_table and line.startswith('|') and '---' not in line:
-                parts = [p.strip() for p in line.split('|')[1:-1]]
-                if len(parts) >= 4 and parts[0] not in ['Boss', '']:
-                    try:
-                        wcl_data[current_difficulty]['boss_rankings'].append({
-                            'boss': parts[0],
-                            'rank_percent': parts[1].replace('%', '').strip(),
-                            'best_amount': int(parts[2].replace(',', '')),
-                            'total_kills': int(parts[3])
-                        })
-                    except:
-                        pass
-            
-            # Stop boss table when we hit another section
-            if line.startswith('---') or line.startswith('##'):
-                in_boss_table = False
-        
-        if in_allstars_table and line.startswith('|') and '---' not in line:
-            parts = [p.strip() for p in line.split('|')[1:-1]]
-            if len(parts) >= 5 and parts[0] not in ['Partition', '']:
-                try:
-                    wcl_data['all_stars'].append({
-                        'partition': parts[0],
-                        'spec': parts[1],
-                        'points': float(parts[2].replace(',', '')),
-                        'possible': float(parts[3].replace(',', '')),
-                        'rank_percent': float(parts[4].replace('%', '').strip())
-                    })
-                except:
-                    pass
-    
-    return wcl_data
-
 def check_missing_buffs(characters):
     """Check which raid buffs are missing from roster"""
     present_classes = set()
@@ -250,117 +115,14 @@ def check_missing_buffs(characters):
     
     return present_buffs, missing_buffs
 
-def generate_html_dashboard(csv_file, output_file="dashboard.html", detailed_dir="detailed"):
-    """Generate complete interactive dashboard with 5 tabs"""
-    
-    if not os.path.exists(csv_file):
-        print(f"❌ CSV file not found: {csv_file}")
-        return
-    
-    print("🎨 Generating enhanced dashboard...")
-    
-    # Load history
-    try:
-        from history_tracker import get_guild_average_history, get_top_improvers
-        guild_history = get_guild_average_history()
-        top_improvers = get_top_improvers(7)
-    except:
-        guild_history = {'dates': [], 'avg_ilvl': [], 'avg_mplus': [], 'avg_wcl': []}
-        top_improvers = []
-    
-    # Load M+ data
-    mplus_data = {}
-    if os.path.exists("logs/mplus_enhanced.json"):
-        with open("logs/mplus_enhanced.json", 'r') as f:
-            mplus_data = json.load(f)
-    
-    # Read characters and their detailed data
-    characters = []
-    character_specs = {}
-    character_details = {}
-    wcl_details = {}
-    character_servers = {}  # Initialize this early, before any other code    
-
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        characters = list(csv.DictReader(f))
-    
-    if os.path.exists(detailed_dir):
-        for fname in os.listdir(detailed_dir):
-            if fname.endswith('.md'):
-                name = fname[:-3]
-                with open(os.path.join(detailed_dir, fname), 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    character_details[name] = content
-                    
-                    # Extract spec icon
-                    for line in content.split('\n'):
-                        if line.startswith('**SPEC_ICON:'):
-                            character_specs[name] = line.replace('**SPEC_ICON:', '').replace('**', '').strip()
-                            break
-                    
-                    # Extract WCL data from markdown
-                    wcl_details[name] = parse_wcl_from_markdown(content)
-    
-    # Check raid buffs
-    present_buffs, missing_buffs = check_missing_buffs(characters)
+# ────────────────────────────────────────────────
+# HTML Templates
+# Built once at import and filled with str.format while rendering; the page
+# is collected as a list of chunks and written in one go instead of growing
+# a single string with += (which copies the whole page on every append).
+AFFIX_EMOJI = {"Tyrannical":"👑","Fortified":"🛡️","Bolstering":"💪","Bursting":"💥","Raging":"😡","Sanguine":"🩸","Volcanic":"🌋","Explosive":"💣","Quaking":"🌊","Grievous":"⚔️","Necrotic":"☠️","Storming":"⛈️","Afflicted":"🤢","Incorporeal":"👻","Entangling":"🌿","Xal'atath's Bargain":"🔮","Xal'atath's Guile":"🔮"}
 
-    # Stats
-    total = len(characters)
-    ilvls = [float(c['ilvl']) for c in characters if c['ilvl'] != 'N/A']
-    mplus_scores = [float(str(c['M+']).replace(',', '')) for c in characters if c['M+'] != 'N/A']
-    wcl_scores = [float(str(c['WCL']).replace(',', '')) for c in characters if c['WCL'] != 'N/A']
-    
-    avg_ilvl = sum(ilvls)/len(ilvls) if ilvls else 0
-    avg_mplus = sum(mplus_scores)/len(mplus_scores) if mplus_scores else 0
-    avg_wcl = sum(wcl_scores)/len(wcl_scores) if wcl_scores else 0
-    
-    # Chart data
-    names = [c['ID'] for c in characters]
-    ilvl_data = [float(c['ilvl']) if c['ilvl']!='N/A' else 0 for c in characters]
-    mplus_data_chart = [float(str(c['M+']).replace(',','')) if c['M+']!='N/A' else 0 for c in characters]
-    wcl_data = [float(str(c['WCL']).replace(',','')) if c['WCL']!='N/A' else 0 for c in characters]
-    
-    classes = [c['Class'] for c in characters]
-    class_colors = {
-        'Deathknight':'#C41E3A','Demon Hunter':'#A330C9','Druid':'#FF7C0A',
-        'Evoker':'#33937F','Hunter':'#AAD372','Mage':'#3FC7EB',
-        'Monk':'#00FF98','Paladin':'#F48CBA','Priest':'#FFFFFF',
-        'Rogue':'#FFF468','Shaman':'#0070DD','Warlock':'#8788EE',
-        'Warrior':'#C69B6D','Demonhunter':'#A330C9'
-    }
-    colors = [class_colors.get(c,'#667eea') for c in classes]
-    
-    # Create filtered WCL data (only characters with actual scores)
-    wcl_filtered_names = []
-    wcl_filtered_data = []
-    wcl_filtered_colors = []
-    for c in characters:
-        try:
-            wcl_val = float(str(c['WCL']).replace(',',''))
-            if wcl_val > 0:  # Only include characters with actual WCL data
-                wcl_filtered_names.append(c['ID'])
-                wcl_filtered_data.append(wcl_val)
-                # Get class color for this character
-                char_class = c['Class']
-                char_color = class_colors.get(char_class, '#667eea')
-                wcl_filtered_colors.append(char_color)
-        except:
-            pass
-    
-    print(f"   - WCL chart: {len(wcl_filtered_names)} characters with raid logs")
-    print(f"   - WCL colors: {wcl_filtered_colors[:3]}...")  # Debug: print first 3 colors
-    
-    def wcl_color(s):
-        if s==100: return '#e6cc80'
-        elif s>=99: return '#e367a5'
-        elif s>=95: return '#ff8000'
-        elif s>=75: return '#a335ee'
-        elif s>=50: return '#0070dd'
-        elif s>=25: return '#1eff00'
-        return '#808080'
-    
-    # Generate HTML
-    html_content = f"""<!DOCTYPE html>
+PAGE_HEAD = """<!DOCTYPE html>
 <html>
 <head>
 <meta charset="UTF-8">
@@ -439,6 +201,8 @@ th{{background:#667eea;color:#fff;padding:12px;text-align:left;cursor:pointer;us
 th:hover{{background:#764ba2}}
 td{{padding:12px;border-bottom:1px solid #eee}}
 tr:hover{{background:#f8f9ff}}
+.roster-viewport{{max-height:75vh;overflow-y:auto;margin-top:20px}}
+#rosterTable thead th{{position:sticky;top:0;z-index:1}}
 .clickable{{cursor:pointer;color:#667eea;font-weight:600;text-decoration:none}}
 .clickable:hover{{text-decoration:underline}}
 .badge{{display:inline-block;padding:4px 12px;border-radius:12px;font-size:.85em;font-weight:600}}
@@ -470,7 +234,7 @@ footer{{text-align:center;color:#fff;margin-top:40px}}
 </head>
 <body>
 <div class="container">
-<header><h1>⚔️ Guild Dashboard</h1><p>{datetime.now().strftime('%Y-%m-%d %H:%M')}</p></header>
+<header><h1>⚔️ Guild Dashboard</h1><p>{generated_at}</p></header>
 <div class="stats-grid">
 <div class="stat-card"><h3>Members</h3><div class="value">{total}</div></div>
 <div class="stat-card"><h3>Avg ilvl</h3><div class="value">{avg_ilvl:.1f}</div></div>
@@ -491,17 +255,11 @@ footer{{text-align:center;color:#fff;margin-top:40px}}
 <h2 style="margin-top:40px">🏆 Top Improvers (Last 7 Days)</h2>
 <table style="margin-top:20px"><thead><tr><th style="width:80px">Rank</th><th>Character</th><th>Class & Spec</th><th>ilvl</th><th>M+</th><th>WCL</th></tr></thead><tbody>
 """
-    
-    # Top Improvers
-    if top_improvers:
-        for i,p in enumerate(top_improvers[:10],1):
-            medal = "🥇" if i==1 else "🥈" if i==2 else "🥉" if i==3 else f"{i}."
-            html_content += f'<tr><td>{medal}</td><td><b>{p["name"]}</b></td><td>{p["spec"]} {p["class"]}</td><td style="color:#28a745">+{p["ilvl_gain"]:.1f}</td><td style="color:#28a745">+{p["mplus_gain"]:.0f}</td><td style="color:#28a745">+{p["wcl_gain"]:.1f}</td></tr>'
-    else:
-        html_content += '<tr><td colspan="6" style="text-align:center;padding:20px">No data yet</td></tr>'
-    
-    # Roster Tab with sorting
-    html_content += """</tbody></table></div>
+
+IMPROVER_ROW = '<tr><td>{medal}</td><td><b>{name}</b></td><td>{spec} {class}</td><td style="color:#28a745">+{ilvl_gain:.1f}</td><td style="color:#28a745">+{mplus_gain:.0f}</td><td style="color:#28a745">+{wcl_gain:.1f}</td></tr>'
+NO_IMPROVERS_ROW = '<tr><td colspan="6" style="text-align:center;padding:20px">No data yet</td></tr>'
+
+ROSTER_TAB_HEAD = """</tbody></table></div>
 <div id="roster" class="tab-content">
 <h2>Character Roster</h2>
 <div class="sort-controls">
@@ -510,39 +268,508 @@ footer{{text-align:center;color:#fff;margin-top:40px}}
 <button class="sort-btn" onclick="sortRoster('mplus')">🏔️ M+ Score</button>
 <button class="sort-btn" onclick="sortRoster('wcl')">📈 WCL Score</button>
 </div>
-<table id="rosterTable" style="margin-top:20px"><thead><tr><th onclick="sortRoster('name')">Character</th><th>Class</th><th>Spec</th><th onclick="sortRoster('ilvl')">ilvl</th><th onclick="sortRoster('mplus')">M+</th><th onclick="sortRoster('wcl')">WCL</th><th>Links</th></tr></thead><tbody>
+<div id="rosterViewport" class="roster-viewport"><table id="rosterTable"><thead><tr><th onclick="sortRoster('name')">Character</th><th>Class</th><th>Spec</th><th onclick="sortRoster('ilvl')">ilvl</th><th onclick="sortRoster('mplus')">M+</th><th onclick="sortRoster('wcl')">WCL</th><th>Links</th></tr></thead><tbody>
+"""
+ROSTER_LINKS = '<a href="{armory_url}" target="_blank" title="Armory" style="display:inline-block;padding:6px 10px;background:#0070dd;color:#fff;text-decoration:none;border-radius:4px;font-size:0.85em;margin-right:4px">🛡️</a><a href="{raiderio_url}" target="_blank" title="Raider.IO" style="display:inline-block;padding:6px 10px;background:#667eea;color:#fff;text-decoration:none;border-radius:4px;font-size:0.85em;margin-right:4px">🏔️</a><a href="{wcl_url}" target="_blank" title="Warcraft Logs" style="display:inline-block;padding:6px 10px;background:#ff8000;color:#fff;text-decoration:none;border-radius:4px;font-size:0.85em">📊</a>'
+MPLUS_BADGE = '<span class="badge" style="background:{color};color:#fff">{score:.0f}</span>'
+WCL_BADGE = '<span class="badge" style="background:{color};color:#fff">{score:.1f}</span>'
+NA_BADGE = '<span class="badge" style="background:#808080;color:#fff">N/A</span>'
+
+CHARTS_TAB = """</tbody></table></div></div>
+<div id="charts" class="tab-content">
+<h2>Item Level Distribution</h2><div class="chart-container"><canvas id="ilvlChart"></canvas></div>
+<h2 style="margin-top:40px">M+ Score Distribution</h2><div class="chart-container"><canvas id="mplusChart"></canvas></div>
+<h2 style="margin-top:40px">WCL Performance Distribution</h2><div class="chart-container"><canvas id="wclChart"></canvas></div>
+</div>
+<div id="mplus" class="tab-content">
+"""
+MPLUS_TITLE = '<h2 style="margin-bottom:30px">🏔️ Mythic+ Recent Runs</h2>'
+SEASON_BADGE = '<span class="badge" title="Highest timed: +{highest_timed}">📚 {runs} runs ({timed} timed) this season</span>'
+MPLUS_CHAR_HEADER = '<div class="char-section"><div class="char-header"><img src="{thumbnail}" class="char-avatar" onerror="this.style.display=\'none\'"><div><h3>{name}</h3><div style="display:flex;gap:15px;margin-top:10px"><span class="badge">{spec} {class}</span><span class="badge">ilvl {ilvl}</span><span class="badge" style="background:{score_color};color:#fff">M+ {score:.0f}</span>{season_badge}</div></div></div>'
+KEY_WITH_UPGRADE = '+{level} <span class="upgrade-badge">(+{chests})</span>'
+RUN_CARD_HEAD = '<div class="run-card"><div class="run-header"><div><div style="font-size:1.3em;font-weight:600">#{rank} {dungeon}</div><div style="color:#666;font-size:.9em">{completed_at}</div></div><div class="key-level" style="background:{level_color}">{key_display}</div></div><div style="margin-bottom:10px;font-weight:600;color:{result_color}">{result} | Score: {score:.1f}</div><div class="affixes">'
+AFFIX = '<span class="affix">{emoji} {name}</span>'
+RUN_TIMES = '</div><div style="display:flex;gap:20px;margin:15px 0"><span>⏱️ {clear_time}</span><span>🎯 {par_time}</span></div><h4 style="color:#667eea">Party Composition</h4><div class="roster">'
+ROSTER_MEMBER = '<div class="roster-member"><div class="role-icon {role}">{emoji}</div><div><div style="font-weight:600">{name}</div><div style="font-size:.85em;color:#666">{spec} {class}</div></div></div>'
+RUN_LINK = '<a href="{url}" target="_blank" style="display:inline-block;margin-top:15px;padding:10px 20px;background:#667eea;color:#fff;text-decoration:none;border-radius:8px;font-weight:600">📊 View on Raider.IO</a>'
+NO_MPLUS = '<div style="text-align:center;padding:60px"><h2>No M+ Data</h2><p>Run python mplus_enhanced.py to fetch detailed dungeon data</p></div>'
+
+RAIDING_TAB_HEAD = """</div>
+<div id="raiding" class="tab-content">
+<h2 style="margin-bottom:20px">🏆 Warcraft Logs Performance</h2>
+<div class="sort-controls" style="margin-bottom:30px">
+<button class="sort-btn active" onclick="switchDifficulty('mythic')">⚔️ Mythic</button>
+<button class="sort-btn" onclick="switchDifficulty('heroic')">🛡️ Heroic</button>
+</div>
 """
+RAID_CHAR_HEAD = '<div class="char-section"><div class="char-header">'
+RAID_AVATAR = '<img src="{spec_icon}" class="char-avatar" onerror="this.style.display=\'none\'">'
+RAID_CHAR_BADGES = '<div style="flex:1"><h3>{name}</h3><div style="display:flex;gap:15px;margin-top:10px;flex-wrap:wrap"><span class="badge">{spec} {class}</span><span class="badge" style="background:{mythic_color};color:#fff">Mythic: {mythic_perf}</span><span class="badge" style="background:{heroic_color};color:#fff">Heroic: {heroic_perf}</span></div></div>'
+RAID_LINKS = '<div style="display:flex;gap:10px;margin-left:auto"><a href="{armory_url}" target="_blank" title="Armory" style="padding:8px 12px;background:#0070dd;color:#fff;text-decoration:none;border-radius:6px;font-size:0.9em">🛡️</a><a href="{raiderio_url}" target="_blank" title="Raider.IO" style="padding:8px 12px;background:#667eea;color:#fff;text-decoration:none;border-radius:6px;font-size:0.9em">🏔️</a><a href="{wcl_url}" target="_blank" title="Warcraft Logs" style="padding:8px 12px;background:#ff8000;color:#fff;text-decoration:none;border-radius:6px;font-size:0.9em">📊</a></div></div>'
+DIFFICULTY_HEADS = {
+    'mythic': '<div class="difficulty-mythic"><h4 style="margin-bottom:15px;color:#a335ee">⚔️ Mythic Boss Performance</h4>',
+    'heroic': '<div class="difficulty-heroic" style="display:none"><h4 style="margin-bottom:15px;color:#0070dd">🛡️ Heroic Boss Performance</h4>'
+}
+BOSS_CARD = '<div class="boss-card" style="border-left-color:{color}"><div style="display:flex;justify-content:space-between;align-items:center"><div><strong>{boss}</strong><div style="color:#666;font-size:.9em;margin-top:5px">{kills} kills | Best: {best_amount:,}</div></div><div style="font-size:1.5em;font-weight:bold;color:{color}">{rank_pct}%</div></div><div class="perf-bar" style="background:#e0e0e0"><div class="perf-fill" style="width:{rank_val}%;background:{color}">{rank_pct}%</div></div></div>'
+ALLSTARS_HEAD = '<h4 style="margin-top:25px;margin-bottom:15px">⭐ All-Stars Points</h4><div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(250px,1fr));gap:15px">'
+ALLSTAR_CARD = '<div style="background:#f8f9fa;padding:15px;border-radius:10px;border:2px solid {color}"><div style="font-weight:600;margin-bottom:10px">{spec} - {partition}</div><div style="font-size:1.3em;color:{color};font-weight:bold">{points:.1f} / {possible:.1f}</div><div style="color:#666;font-size:.9em;margin-top:5px">Rank: {rank_pct}%</div></div>'
+NO_RAID_LOGS = '<div style="text-align:center;padding:60px"><h2>No Raid Logs Available</h2><p>Characters need raid parses on Warcraft Logs</p></div>'
+NO_RAID_DATA = '<div style="text-align:center;padding:60px"><h2>No Raid Data</h2><p>Run the crawler to fetch Warcraft Logs data</p></div>'
+
+PAGE_TAIL = """</div>
+</div>
+<div id="modal" class="modal">
+<div class="modal-content">
+<div class="modal-header"><span class="close" onclick="closeModal()">&times;</span><h2 id="modalTitle">Details</h2></div>
+<div class="modal-body" id="modalBody"></div>
+</div>
+</div>
+<footer><p>두부킴의 유기견들</p></footer>
+</div>
+<script>
+const details={details};
+const rosterData={roster_data};
+const rosterOrder={roster_order};
+{detail_loader}let currentSort='name';
+let currentDifficulty='mythic';
+
+function switchDifficulty(diff){{
+    currentDifficulty=diff;
+    document.querySelectorAll('.sort-controls .sort-btn').forEach(b=>b.classList.remove('active'));
+    event.target.classList.add('active');
+    document.querySelectorAll('.difficulty-mythic').forEach(el=>el.style.display=diff==='mythic'?'block':'none');
+    document.querySelectorAll('.difficulty-heroic').forEach(el=>el.style.display=diff==='heroic'?'block':'none');
+}}
+
+// Roster: rows are built once; only the rows inside the viewport are attached
+const ROSTER_OVERSCAN=10;
+let rosterRows=null,rosterView=rosterOrder.name,rosterRowHeight=0,rosterFrame=0;
+const rosterTop=rosterSpacer(),rosterBottom=rosterSpacer();
+
+function rosterSpacer(){{const tr=document.createElement('tr');tr.innerHTML='<td colspan="7" style="padding:0;border:0"></td>';return tr}}
+
+function rosterRowHtml(rd){{
+    const specDisp=rd.spec_icon?`<img src="${{rd.spec_icon}}" style="width:24px;height:24px;vertical-align:middle;margin-right:6px;border-radius:4px" onerror="this.style.display='none'"> ${{rd.spec}}`:rd.spec;
+    const nameDisp=rd.has_detail?`<a href="#" class="clickable" onclick="showChar('${{rd.name}}');return false">${{rd.name}}</a>`:`<b>${{rd.name}}</b>`;
+    return `<tr><td>${{nameDisp}}</td><td>${{rd.class}}</td><td>${{specDisp}}</td><td>${{rd.ilvl_display}}</td><td>${{rd.mplus_badge}}</td><td>${{rd.wcl_badge}}</td><td>${{rd.links}}</td></tr>`;
+}}
+
+function renderRoster(){{
+    const viewport=document.getElementById('rosterViewport');
+    if(!rosterRows){{
+        const t=document.createElement('template');
+        t.innerHTML=rosterData.map(rosterRowHtml).join('');
+        rosterRows=Array.from(t.content.children);
+    }}
+    const h=rosterRowHeight||49;
+    const visible=Math.ceil((viewport.clientHeight||window.innerHeight)/h);
+    const first=Math.max(0,Math.floor(viewport.scrollTop/h)-ROSTER_OVERSCAN);
+    const last=Math.min(rosterView.length,first+visible+2*ROSTER_OVERSCAN);
+    
+    const frag=document.createDocumentFragment();
+    rosterTop.firstChild.style.height=(first*h)+'px';
+    frag.appendChild(rosterTop);
+    for(let i=first;i<last;i++)frag.appendChild(rosterRows[rosterView[i]]);
+    rosterBottom.firstChild.style.height=((rosterView.length-last)*h)+'px';
+    frag.appendChild(rosterBottom);
+    document.querySelector('#rosterTable tbody').replaceChildren(frag);
+    
+    // Row height is only known once the roster tab is visible
+    if(!rosterRowHeight&&last>first){{
+        const measured=rosterRows[rosterView[first]].offsetHeight;
+        if(measured){{rosterRowHeight=measured;renderRoster()}}
+    }}
+}}
+
+function sortRoster(by){{
+    currentSort=by;
+    document.querySelectorAll('.sort-controls .sort-btn').forEach(b=>b.classList.remove('active'));
+    event.target.classList.add('active');
+    
+    rosterView=rosterOrder[by];
+    document.getElementById('rosterViewport').scrollTop=0;
+    renderRoster();
+}}
+
+document.getElementById('rosterViewport').addEventListener('scroll',()=>{{if(!rosterFrame)rosterFrame=requestAnimationFrame(()=>{{rosterFrame=0;renderRoster()}})}});
+renderRoster();
+
+function switchTab(e,t){{document.querySelectorAll('.tab-content').forEach(el=>el.classList.remove('active'));document.querySelectorAll('.tab-btn').forEach(el=>el.classList.remove('active'));document.getElementById(t).classList.add('active');e.currentTarget.classList.add('active');if(t==='roster')renderRoster()}}
+
+function showChar(n){{const m=document.getElementById('modal');document.getElementById('modalTitle').textContent=n;{detail_hook}if(details[n]){{let c=details[n],lines=c.split('\\n'),html='',inT=false,rows=[],isEq=false,specIcon='';for(let line of lines){{if(line.startsWith('**SPEC_ICON:')){{specIcon=line.replace('**SPEC_ICON:','').replace('**','').trim();continue}}if(line.includes('## ⚔️ Equipment'))isEq=true;else if(line.startsWith('##'))isEq=false;if(line.trim().startsWith('|')){{if(!inT){{inT=true;rows=[]}}rows.push(line);continue}}else if(inT){{html+=procTable(rows,isEq);inT=false;rows=[]}}if(line.startsWith('# '))html+=`<h2>${{line.substring(2)}}</h2>`;else if(line.startsWith('## '))html+=`<h3>${{line.substring(3)}}</h3>`;else if(line.startsWith('### '))html+=`<h4>${{line.substring(4)}}</h4>`;else if(line.trim()==='---')html+='<hr>';else if(line.trim()==='')html+='<br>';else{{line=line.replace(/\\*\\*(.+?)\\*\\*/g,'<strong>$1</strong>').replace(/\\*(.+?)\\*/g,'<em>$1</em>');if(specIcon&&line.includes('|')&&(line.includes('Tank')||line.includes('Healer')||line.includes('Melee')||line.includes('Ranged')))line=`<img src="${{specIcon}}" style="width:24px;height:24px;vertical-align:middle;margin-right:8px;border-radius:4px;border:2px solid #667eea" onerror="this.style.display='none'"> `+line;html+=`<p>${{line}}</p>`}}}}if(inT)html+=procTable(rows,isEq);document.getElementById('modalBody').innerHTML=html;m.style.display='block'}}}}
+
+function procTable(rows,isEq){{if(!rows.length)return '';let h='<table style="width:100%;border-collapse:collapse;margin:20px 0">';for(let i=0;i<rows.length;i++){{const cells=rows[i].split('|').filter(c=>c.trim());if(cells[0]&&cells[0].includes('---'))continue;if(i===0){{h+='<thead><tr>';cells.forEach((c,idx)=>{{if(!(isEq&&idx===4&&c.trim()==='Icon'))h+=`<th style="background:#667eea;color:#fff;padding:12px">${{c.trim()}}</th>`}});h+='</tr></thead><tbody>'}}else{{h+='<tr>';cells.forEach((c,idx)=>{{if(isEq){{if(idx===1&&cells.length>=5){{const ic=cells[4].trim();if(ic.startsWith('ICON:')){{const url=ic.substring(5);if(url&&url.startsWith('http'))h+=`<td style="padding:12px"><img src="${{url}}" style="width:32px;height:32px;vertical-align:middle;margin-right:8px;border-radius:4px;border:2px solid #667eea" onerror="this.style.display='none'"> ${{c.trim()}}</td>`;else h+=`<td style="padding:12px">${{c.trim()}}</td>`}}else h+=`<td style="padding:12px">${{c.trim()}}</td>`}}else if(idx===3){{const upgrade=c.trim();let color='#667eea';if(upgrade.includes('8/8'))color='#ff8000';else if(upgrade.includes('7/8')||upgrade.includes('6/8'))color='#a335ee';else if(upgrade.includes('5/8')||upgrade.includes('4/8'))color='#0070dd';else if(upgrade.includes('1/8')||upgrade.includes('2/8')||upgrade.includes('3/8'))color='#1eff00';h+=`<td style="padding:12px"><span style="color:${{color}};font-weight:600">${{upgrade}}</span></td>`}}else if(idx!==4)h+=`<td style="padding:12px">${{c.trim()}}</td>`}}else h+=`<td style="padding:12px">${{c.trim()}}</td>`}});h+='</tr>'}}}}return h+'</tbody></table>'}}
+
+function closeModal(){{document.getElementById('modal').style.display='none'}}
+window.onclick=e=>{{if(e.target==document.getElementById('modal'))closeModal()}}
+
+const bg={{beforeDraw:c=>{{const x=c.ctx;x.save();x.fillStyle='#f8f9fa';x.fillRect(0,0,c.width,c.height);x.restore()}}}};
+
+new Chart(document.getElementById('trendChart'),{{type:'line',data:{{labels:{trend_dates},datasets:[{{label:'ilvl',data:{trend_ilvl},borderColor:'#667eea',tension:.4,yAxisID:'y1'}},{{label:'M+',data:{trend_mplus},borderColor:'#FF6B6B',tension:.4,yAxisID:'y2'}},{{label:'WCL',data:{trend_wcl},borderColor:'#4ECDC4',tension:.4,yAxisID:'y3'}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true,position:'top'}}}},scales:{{y1:{{type:'linear',position:'left',title:{{display:true,text:'ilvl',color:'#667eea'}},ticks:{{color:'#667eea'}}}},y2:{{type:'linear',position:'right',title:{{display:true,text:'M+',color:'#FF6B6B'}},ticks:{{color:'#FF6B6B'}},grid:{{display:false}}}},y3:{{type:'linear',position:'right',title:{{display:true,text:'WCL',color:'#4ECDC4'}},ticks:{{color:'#4ECDC4'}},grid:{{display:false}}}}}}}},plugins:[bg]}});
+
+new Chart(document.getElementById('ilvlChart'),{{type:'bar',data:{{labels:{names},datasets:[{{label:'Item Level',data:{ilvl_data},backgroundColor:{colors},borderColor:'#000000',borderWidth:2}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true}}}},scales:{{x:{{ticks:{{autoSkip:false,maxRotation:0,minRotation:0}}}},y:{{min:720,max:730,title:{{display:true,text:'Item Level'}}}}}}}},plugins:[bg]}});
+
+new Chart(document.getElementById('mplusChart'),{{type:'bar',data:{{labels:{names},datasets:[{{label:'M+ Score',data:{mplus_data},backgroundColor:{colors},borderColor:'#000000',borderWidth:2}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true}}}},scales:{{x:{{ticks:{{autoSkip:false,maxRotation:0,minRotation:0}}}},y:{{title:{{display:true,text:'M+ Score'}}}}}}}},plugins:[bg]}});
+
+const wclNames={wcl_names};
+const wclData={wcl_data};
+const wclColors={wcl_colors};
+
+console.log('WCL Names:', wclNames);
+console.log('WCL Data:', wclData);
+console.log('WCL Colors:', wclColors);
+
+new Chart(document.getElementById('wclChart'),{{type:'bar',data:{{labels:wclNames,datasets:[{{label:'WCL Performance',data:wclData,backgroundColor:wclColors,borderColor:'#000000',borderWidth:2}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true,position:'top'}}}},scales:{{x:{{ticks:{{autoSkip:false,maxRotation:0,minRotation:0}}}},y:{{min:0,max:100,title:{{display:true,text:'WCL Percentile'}}}}}}}},plugins:[bg]}});
+</script>
+</body>
+</html>"""
+
+# Split-details mode: the modal loads <dashboard>_details/<id>.js with a script tag
+# (works from file:// too), which hands its pre-rendered HTML to registerDetail()
+DETAIL_LOADER = """const detailFiles={files};
+const detailHtml={{}};
+function loadChar(n){{const b=document.getElementById('modalBody');document.getElementById('modal').style.display='block';if(n in detailHtml){{b.innerHTML=detailHtml[n];return}}b.innerHTML='<p>⏳ Loading...</p>';const s=document.createElement('script');s.src=detailFiles[n];s.onerror=()=>{{b.innerHTML='<p>❌ Could not load details</p>'}};document.head.appendChild(s)}}
+function registerDetail(n,h){{detailHtml[n]=h;if(document.getElementById('modalTitle').textContent===n)document.getElementById('modalBody').innerHTML=h}}
+"""
+DETAIL_HOOK = 'if(detailFiles[n])return loadChar(n);'
+DETAIL_FRAGMENT = 'registerDetail({name},{html});\n'
+
+DETAIL_SPEC_ICON = '<img src="{spec_icon}" style="width:24px;height:24px;vertical-align:middle;margin-right:8px;border-radius:4px;border:2px solid #667eea" onerror="this.style.display=\'none\'"> '
+DETAIL_TABLE_HEAD = '<table style="width:100%;border-collapse:collapse;margin:20px 0">'
+DETAIL_TH = '<th style="background:#667eea;color:#fff;padding:12px">{}</th>'
+DETAIL_TD = '<td style="padding:12px">{}</td>'
+DETAIL_ICON_TD = '<td style="padding:12px"><img src="{url}" style="width:32px;height:32px;vertical-align:middle;margin-right:8px;border-radius:4px;border:2px solid #667eea" onerror="this.style.display=\'none\'"> {text}</td>'
+DETAIL_UPGRADE_TD = '<td style="padding:12px"><span style="color:{color};font-weight:600">{upgrade}</span></td>'
+
+def format_run_time(ms):
+    """m:ss for a run duration in milliseconds"""
+    if ms<=0: return "N/A"
+    s=ms/1000
+    return f"{int(s//60)}:{int(s%60):02d}"
+
+# ────────────────────────────────────────────────
+# Character Details (server-side port of the page's showChar / procTable)
+def _upgrade_color(upgrade):
+    if '8/8' in upgrade: return '#ff8000'
+    elif '7/8' in upgrade or '6/8' in upgrade: return '#a335ee'
+    elif '5/8' in upgrade or '4/8' in upgrade: return '#0070dd'
+    elif '1/8' in upgrade or '2/8' in upgrade or '3/8' in upgrade: return '#1eff00'
+    return '#667eea'
+
+def render_detail_table(rows, is_equipment):
+    """HTML for one markdown table (Equipment tables get item icons and upgrade colors)"""
+    if not rows:
+        return ''
+    parts = [DETAIL_TABLE_HEAD]
+    for i, row in enumerate(rows):
+        cells = [c for c in row.split('|') if c.strip()]
+        if cells and '---' in cells[0]:
+            continue
+        if i == 0:
+            parts.append('<thead><tr>')
+            for idx, c in enumerate(cells):
+                if not (is_equipment and idx == 4 and c.strip() == 'Icon'):
+                    parts.append(DETAIL_TH.format(c.strip()))
+            parts.append('</tr></thead><tbody>')
+            continue
+
+        parts.append('<tr>')
+        for idx, c in enumerate(cells):
+            if not is_equipment:
+                parts.append(DETAIL_TD.format(c.strip()))
+            elif idx == 1 and len(cells) >= 5:
+                icon = cells[4].strip()
+                url = icon[5:] if icon.startswith('ICON:') else ''
+                if url.startswith('http'):
+                    parts.append(DETAIL_ICON_TD.format(url=url, text=c.strip()))
+                else:
+                    parts.append(DETAIL_TD.format(c.strip()))
+            elif idx == 3:
+                upgrade = c.strip()
+                parts.append(DETAIL_UPGRADE_TD.format(color=_upgrade_color(upgrade), upgrade=upgrade))
+            elif idx != 4:
+                parts.append(DETAIL_TD.format(c.strip()))
+        parts.append('</tr>')
+    parts.append('</tbody></table>')
+    return ''.join(parts)
+
+def render_character_detail(content):
+    """Modal HTML for a detailed/*.md report, exactly as showChar renders it in the browser"""
+    parts = []
+    in_table = False
+    rows = []
+    is_equipment = False
+    spec_icon = ''
+    for line in content.split('\n'):
+        if line.startswith('**SPEC_ICON:'):
+            spec_icon = line.replace('**SPEC_ICON:', '', 1).replace('**', '', 1).strip()
+            continue
+        if '## ⚔️ Equipment' in line:
+            is_equipment = True
+        elif line.startswith('##'):
+            is_equipment = False
+
+        if line.strip().startswith('|'):
+            if not in_table:
+                in_table = True
+                rows = []
+            rows.append(line)
+            continue
+        elif in_table:
+            parts.append(render_detail_table(rows, is_equipment))
+            in_table = False
+            rows = []
+
+        if line.startswith('# '):
+            parts.append(f'<h2>{line[2:]}</h2>')
+        elif line.startswith('## '):
+            parts.append(f'<h3>{line[3:]}</h3>')
+        elif line.startswith('### '):
+            parts.append(f'<h4>{line[4:]}</h4>')
+        elif line.strip() == '---':
+            parts.append('<hr>')
+        elif line.strip() == '':
+            parts.append('<br>')
+        else:
+            line = re.sub(r'\*(.+?)\*', r'<em>\1</em>', re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', line))
+            if spec_icon and '|' in line and any(role in line for role in ('Tank', 'Healer', 'Melee', 'Ranged')):
+                line = DETAIL_SPEC_ICON.format(spec_icon=spec_icon) + line
+            parts.append(f'<p>{line}</p>')
+    if in_table:
+        parts.append(render_detail_table(rows, is_equipment))
+    return ''.join(parts)
+
+def write_detail_fragments(character_details, output_file):
+    """Pre-render every character's details next to the dashboard; returns {name: script src}"""
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    folder = os.path.splitext(os.path.basename(output_file))[0] + "_details"
+    fragment_dir = os.path.join(output_dir, folder)
+    os.makedirs(fragment_dir, exist_ok=True)
+
+    files = {}
+    for name, content in character_details.items():
+        if not content:
+            continue  # showChar opens nothing for an empty report
+        fname = hashlib.sha1(name.encode('utf-8')).hexdigest()[:12] + ".js"
+        fragment = DETAIL_FRAGMENT.format(
+            name=json.dumps(name, ensure_ascii=False),
+            html=json.dumps(render_character_detail(content), ensure_ascii=False)
+        )
+        with open(os.path.join(fragment_dir, fname), 'w', encoding='utf-8') as f:
+            f.write(fragment)
+        files[name] = f"{folder}/{fname}"
+
+    # Drop fragments of characters that left the roster
+    written = {os.path.basename(src) for src in files.values()}
+    for fname in os.listdir(fragment_dir):
+        if fname.endswith('.js') and fname not in written:
+            os.remove(os.path.join(fragment_dir, fname))
+    return files
+
+# ────────────────────────────────────────────────
+# Character Index
+def build_character_index(characters, crawl_records, reports, season_runs):
+    """ID -> merged record (CSV row, spec icon, server, WCL, M+ season) for one dashboard build
+
+    Structured crawl results are used when present; the parsed markdown report
+    is the fallback. A repeated ID keeps its first row.
+    """
+    index = {}
+    for row in characters:
+        name = row['ID']
+        if name in index:
+            continue
+        record = crawl_records.get(name)
+        report = reports.get(name)
+        if record:
+            spec_icon, wcl = record['spec_icon'], record['wcl']
+        elif report is not None:
+            spec_icon, wcl = report['spec_icon'], report['wcl']
+        else:
+            spec_icon, wcl = '', None
+        
+        try:
+            wcl_score = float(str(row['WCL']).replace(',','')) if row['WCL'] != 'N/A' else 0
+        except (TypeError, ValueError):
+            wcl_score = 0
+        
+        index[name] = {
+            'row': row,
+            'spec_icon': spec_icon or '',
+            'server': (record or {}).get('server') or 'azshara',
+            'has_detail': report is not None,
+            'wcl': wcl,
+            'wcl_score': wcl_score,
+            'season': season_runs.get(name)
+        }
+    return index
+
+def generate_html_dashboard(csv_file, output_file="dashboard.html", detailed_dir="detailed", split_details=None,
+                            profile_memory=None):
+    """Generate complete interactive dashboard with 5 tabs
+
+    split_details (default: DASHBOARD_SPLIT_DETAILS) writes character details
+    to <output>_details/ instead of inlining every markdown report.
+    profile_memory (default: DASHBOARD_PROFILE_MEMORY) also reports the
+    render's peak memory; the render is then timed under tracemalloc.
+    """
+    if split_details is None:
+        split_details = DASHBOARD_SPLIT_DETAILS
+    if profile_memory is None:
+        profile_memory = DASHBOARD_PROFILE_MEMORY
+    
+    if not os.path.exists(csv_file):
+        print(f"❌ CSV file not found: {csv_file}")
+        return
+    
+    print("🎨 Generating enhanced dashboard...")
+    
+    # Load history
+    try:
+        from history_tracker import get_guild_average_history, get_top_improvers
+        guild_history = get_guild_average_history()
+        top_improvers = get_top_improvers(7)
+    except:
+        guild_history = {'dates': [], 'avg_ilvl': [], 'avg_mplus': [], 'avg_wcl': []}
+        top_improvers = []
+    
+    # M+ data is streamed from logs/mplus_enhanced.jsonl (highest score first) while rendering
+    mplus_entries = iter_mplus_by_score()
+    
+    # Season-long run counts from the run store (filled by mplus_enhanced.py)
+    season_runs = {}
+    if os.path.exists(MPLUS_RUNS_DB_FILE):
+        run_store = MplusRunStore()
+        season_runs = run_store.season_summary()
+        run_store.close()
+    
+    # Read characters and their detailed data
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        characters = list(csv.DictReader(f))
+    
+    # Parsed detailed/*.md reports (unchanged files come from the report cache)
+    cache_hits, cache_misses = report_cache.hits, report_cache.misses
+    reports = report_cache.load_reports(detailed_dir)
+    print(f"   - Reports: {report_cache.hits - cache_hits} cached, {report_cache.misses - cache_misses} parsed")
+    character_details = {name: report['content'] for name, report in reports.items()}
+    
+    # Measure the render only (report loading and its process pool are excluded)
+    render_started = time.perf_counter()
+    was_tracing = tracemalloc.is_tracing()
+    if profile_memory:
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    
+    # One merged record per character, shared by every tab below
+    character_index = build_character_index(characters, load_crawl_results(), reports, season_runs)
+    
+    # Check raid buffs
+    present_buffs, missing_buffs = check_missing_buffs(characters)
+
+    # Stats
+    total = len(characters)
+    ilvls = [float(c['ilvl']) for c in characters if c['ilvl'] != 'N/A']
+    mplus_scores = [float(str(c['M+']).replace(',', '')) for c in characters if c['M+'] != 'N/A']
+    wcl_scores = [float(str(c['WCL']).replace(',', '')) for c in characters if c['WCL'] != 'N/A']
+    
+    avg_ilvl = sum(ilvls)/len(ilvls) if ilvls else 0
+    avg_mplus = sum(mplus_scores)/len(mplus_scores) if mplus_scores else 0
+    avg_wcl = sum(wcl_scores)/len(wcl_scores) if wcl_scores else 0
+    
+    # Chart data
+    names = [c['ID'] for c in characters]
+    ilvl_data = [float(c['ilvl']) if c['ilvl']!='N/A' else 0 for c in characters]
+    mplus_data_chart = [float(str(c['M+']).replace(',','')) if c['M+']!='N/A' else 0 for c in characters]
+    wcl_data = [float(str(c['WCL']).replace(',','')) if c['WCL']!='N/A' else 0 for c in characters]
+    
+    classes = [c['Class'] for c in characters]
+    class_colors = {
+        'Deathknight':'#C41E3A','Demon Hunter':'#A330C9','Druid':'#FF7C0A',
+        'Evoker':'#33937F','Hunter':'#AAD372','Mage':'#3FC7EB',
+        'Monk':'#00FF98','Paladin':'#F48CBA','Priest':'#FFFFFF',
+        'Rogue':'#FFF468','Shaman':'#0070DD','Warlock':'#8788EE',
+        'Warrior':'#C69B6D','Demonhunter':'#A330C9'
+    }
+    colors = [class_colors.get(c,'#667eea') for c in classes]
+    
+    # Create filtered WCL data (only characters with actual scores)
+    wcl_filtered_names = []
+    wcl_filtered_data = []
+    wcl_filtered_colors = []
+    for c in characters:
+        try:
+            wcl_val = float(str(c['WCL']).replace(',',''))
+            if wcl_val > 0:  # Only include characters with actual WCL data
+                wcl_filtered_names.append(c['ID'])
+                wcl_filtered_data.append(wcl_val)
+                # Get class color for this character
+                char_class = c['Class']
+                char_color = class_colors.get(char_class, '#667eea')
+                wcl_filtered_colors.append(char_color)
+        except:
+            pass
+    
+    print(f"   - WCL chart: {len(wcl_filtered_names)} characters with raid logs")
+    print(f"   - WCL colors: {wcl_filtered_colors[:3]}...")  # Debug: print first 3 colors
+    
+    def wcl_color(s):
+        if s==100: return '#e6cc80'
+        elif s>=99: return '#e367a5'
+        elif s>=95: return '#ff8000'
+        elif s>=75: return '#a335ee'
+        elif s>=50: return '#0070dd'
+        elif s>=25: return '#1eff00'
+        return '#808080'
+    
+    # Generate HTML
+    html_chunks = []
+    emit = html_chunks.append
+    emit(PAGE_HEAD.format(
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M'), total=total,
+        avg_ilvl=avg_ilvl, avg_mplus=avg_mplus, avg_wcl=avg_wcl
+    ))
+    
+    # Top Improvers
+    if top_improvers:
+        for i,p in enumerate(top_improvers[:10],1):
+            medal = "🥇" if i==1 else "🥈" if i==2 else "🥉" if i==3 else f"{i}."
+            emit(IMPROVER_ROW.format(medal=medal, **p))
+    else:
+        emit(NO_IMPROVERS_ROW)
+    
+    # Roster Tab with sorting
+    emit(ROSTER_TAB_HEAD)
     
     # Store roster data in JSON for client-side sorting
     roster_data = []
     for c in characters:
         name = c['ID']
-        has_detail = name in character_details
-        spec_icon = character_specs.get(name,'')
-        server = character_servers.get(name, 'azshara')
+        entry = character_index[name]
+        has_detail = entry['has_detail']
+        spec_icon = entry['spec_icon']
+        server = entry['server']
         
         # Generate profile links
-        armory_url = f"https://worldofwarcraft.blizzard.com/ko-kr/character/kr/{server.lower()}/{name.lower()}"
-        raiderio_url = f"https://raider.io/characters/kr/{server}/{name}"
-        wcl_url = f"https://www.warcraftlogs.com/character/kr/{server.lower()}/{name}"
-        
-        links_html = f'<a href="{armory_url}" target="_blank" title="Armory" style="display:inline-block;padding:6px 10px;background:#0070dd;color:#fff;text-decoration:none;border-radius:4px;font-size:0.85em;margin-right:4px">🛡️</a><a href="{raiderio_url}" target="_blank" title="Raider.IO" style="display:inline-block;padding:6px 10px;background:#667eea;color:#fff;text-decoration:none;border-radius:4px;font-size:0.85em;margin-right:4px">🏔️</a><a href="{wcl_url}" target="_blank" title="Warcraft Logs" style="display:inline-block;padding:6px 10px;background:#ff8000;color:#fff;text-decoration:none;border-radius:4px;font-size:0.85em">📊</a>'
+        links_html = ROSTER_LINKS.format(
+            armory_url=f"https://worldofwarcraft.blizzard.com/ko-kr/character/kr/{server.lower()}/{name.lower()}",
+            raiderio_url=f"https://raider.io/characters/kr/{server}/{name}",
+            wcl_url=f"https://www.warcraftlogs.com/character/kr/{server.lower()}/{name}"
+        )
         
         try:
             mp = float(str(c['M+']).replace(',',''))
-            mp_color = get_rio_color(mp)
-            mp_badge = f'<span class="badge" style="background:{mp_color};color:#fff">{mp:.0f}</span>'
+            mp_badge = MPLUS_BADGE.format(color=get_rio_color(mp), score=mp)
         except:
             mp = 0
-            mp_badge = '<span class="badge" style="background:#808080;color:#fff">N/A</span>'
+            mp_badge = NA_BADGE
         
         try:
             wc = float(str(c['WCL']).replace(',',''))
-            wc_col = wcl_color(wc)
-            wc_badge = f'<span class="badge" style="background:{wc_col};color:#fff">{wc:.1f}</span>'
+            wc_badge = WCL_BADGE.format(color=wcl_color(wc), score=wc)
         except:
             wc = 0
-            wc_badge = '<span class="badge" style="background:#808080;color:#fff">N/A</span>'
+            wc_badge = NA_BADGE
         
         try:
             ilvl_val = float(c['ilvl'])
@@ -564,29 +791,22 @@ footer{{text-align:center;color:#fff;margin-top:40px}}
             'links': links_html
         })
     
-    # Initial display (alphabetical)
+    # Initial display (alphabetical); rows are built and windowed client-side
     roster_data.sort(key=lambda x: x['name'])
     
-    for rd in roster_data:
-        spec_disp = f'<img src="{rd["spec_icon"]}" style="width:24px;height:24px;vertical-align:middle;margin-right:6px;border-radius:4px" onerror="this.style.display=\'none\'"> {rd["spec"]}' if rd["spec_icon"] else rd["spec"]
-        name_disp = f'<a href="#" class="clickable" onclick="showChar(\'{rd["name"]}\');return false">{rd["name"]}</a>' if rd["has_detail"] else f'<b>{rd["name"]}</b>'
-        
-        html_content += f'<tr><td>{name_disp}</td><td>{rd["class"]}</td><td>{spec_disp}</td><td>{rd["ilvl_display"]}</td><td>{rd["mplus_badge"]}</td><td>{rd["wcl_badge"]}</td><td>{rd["links"]}</td></tr>'
+    # Pre-sorted row indexes for each roster sort (highest first for numbers)
+    roster_order = {'name': list(range(len(roster_data)))}
+    for key in ('ilvl', 'mplus', 'wcl'):
+        roster_order[key] = sorted(range(len(roster_data)), key=lambda i: roster_data[i][key], reverse=True)
     
     # Charts Tab
-    html_content += """</tbody></table></div>
-<div id="charts" class="tab-content">
-<h2>Item Level Distribution</h2><div class="chart-container"><canvas id="ilvlChart"></canvas></div>
-<h2 style="margin-top:40px">M+ Score Distribution</h2><div class="chart-container"><canvas id="mplusChart"></canvas></div>
-<h2 style="margin-top:40px">WCL Performance Distribution</h2><div class="chart-container"><canvas id="wclChart"></canvas></div>
-</div>
-<div id="mplus" class="tab-content">
-"""
+    emit(CHARTS_TAB)
     
     # M+ Tab with enhanced display
-    if mplus_data:
-        html_content += '<h2 style="margin-bottom:30px">🏔️ Mythic+ Recent Runs</h2>'
-        sorted_m = sorted([(n,d) for n,d in mplus_data.items() if d], key=lambda x:x[1].get("character",{}).get("score",0), reverse=True)
+    first_mplus = next(mplus_entries, None)
+    if first_mplus:
+        emit(MPLUS_TITLE)
+        sorted_m = ((n,d) for n,d in itertools.chain([first_mplus], mplus_entries) if d)
         
         for name,data in sorted_m:
             ci = data.get("character",{})
@@ -594,9 +814,17 @@ footer{{text-align:center;color:#fff;margin-top:40px}}
             if not runs: continue
             
             score = ci.get("score",0)
-            score_color = get_rio_color(score)
+            entry = character_index.get(name)
+            season = entry['season'] if entry else season_runs.get(name)
+            season_badge = SEASON_BADGE.format(
+                highest_timed=season["highest_timed"] or 0, runs=season["runs"], timed=season["timed"] or 0
+            ) if season else ''
             
-            html_content += f'<div class="char-section"><div class="char-header"><img src="{ci.get("thumbnail","")}" class="char-avatar" onerror="this.style.display=\'none\'"><div><h3>{ci.get("name",name)}</h3><div style="display:flex;gap:15px;margin-top:10px"><span class="badge">{ci.get("spec","")} {ci.get("class","")}</span><span class="badge">ilvl {ci.get("ilvl",0)}</span><span class="badge" style="background:{score_color};color:#fff">M+ {score:.0f}</span></div></div></div>'
+            emit(MPLUS_CHAR_HEADER.format(
+                thumbnail=ci.get("thumbnail",""), name=ci.get("name",name), spec=ci.get("spec",""),
+                ilvl=ci.get("ilvl",0), score_color=get_rio_color(score), score=score, season_badge=season_badge,
+                **{"class": ci.get("class","")}
+            ))
             
             for i,run in enumerate(runs,1):
                 lv = run.get('level',0)
@@ -606,133 +834,91 @@ footer{{text-align:center;color:#fff;margin-top:40px}}
                 
                 # Unified key level display
                 if timed and chests > 0:
-                    key_display = f'+{lv} <span class="upgrade-badge">(+{chests})</span>'
+                    key_display = KEY_WITH_UPGRADE.format(level=lv, chests=chests)
                 else:
                     key_display = f'+{lv}'
                 
-                def fmt(ms):
-                    if ms<=0: return "N/A"
-                    s=ms/1000
-                    return f"{int(s//60)}:{int(s%60):02d}"
-                
-                html_content += f'<div class="run-card"><div class="run-header"><div><div style="font-size:1.3em;font-weight:600">#{i} {run.get("dungeon","")}</div><div style="color:#666;font-size:.9em">{run.get("completed_at","")}</div></div><div class="key-level" style="background:{lv_col}">{key_display}</div></div><div style="margin-bottom:10px;font-weight:600;color:{"#28a745" if timed else "#dc3545"}">{"✅ Timed" if timed else "❌ Depleted"} | Score: {run.get("score",0):.1f}</div><div class="affixes">'
-                
-                aff_emoji = {"Tyrannical":"👑","Fortified":"🛡️","Bolstering":"💪","Bursting":"💥","Raging":"😡","Sanguine":"🩸","Volcanic":"🌋","Explosive":"💣","Quaking":"🌊","Grievous":"⚔️","Necrotic":"☠️","Storming":"⛈️","Afflicted":"🤢","Incorporeal":"👻","Entangling":"🌿","Xal'atath's Bargain":"🔮","Xal'atath's Guile":"🔮"}
+                emit(RUN_CARD_HEAD.format(
+                    rank=i, dungeon=run.get("dungeon",""), completed_at=run.get("completed_at",""),
+                    level_color=lv_col, key_display=key_display,
+                    result_color="#28a745" if timed else "#dc3545", result="✅ Timed" if timed else "❌ Depleted",
+                    score=run.get("score",0)
+                ))
                 
                 for aff in run.get('affixes',[]):
-                    html_content += f'<span class="affix">{aff_emoji.get(aff.get("name",""),"🔸")} {aff.get("name","")}</span>'
+                    emit(AFFIX.format(emoji=AFFIX_EMOJI.get(aff.get("name",""),"🔸"), name=aff.get("name","")))
                 
-                html_content += f'</div><div style="display:flex;gap:20px;margin:15px 0"><span>⏱️ {fmt(run.get("clear_time_ms",0))}</span><span>🎯 {fmt(run.get("par_time_ms",0))}</span></div><h4 style="color:#667eea">Party Composition</h4><div class="roster">'
+                emit(RUN_TIMES.format(
+                    clear_time=format_run_time(run.get("clear_time_ms",0)),
+                    par_time=format_run_time(run.get("par_time_ms",0))
+                ))
                 
                 for mem in run.get('roster',[]):
                     role = mem.get('role','dps').lower()
                     emoji = "🛡️" if role=="tank" else "💚" if role=="healer" else "⚔️"
-                    html_content += f'<div class="roster-member"><div class="role-icon {role}">{emoji}</div><div><div style="font-weight:600">{mem.get("name","")}</div><div style="font-size:.85em;color:#666">{mem.get("spec","")} {mem.get("class","")}</div></div></div>'
+                    emit(ROSTER_MEMBER.format(
+                        role=role, emoji=emoji, name=mem.get("name",""), spec=mem.get("spec",""),
+                        **{"class": mem.get("class","")}
+                    ))
                 
                 if run.get('url'):
-                    html_content += f'<a href="{run["url"]}" target="_blank" style="display:inline-block;margin-top:15px;padding:10px 20px;background:#667eea;color:#fff;text-decoration:none;border-radius:8px;font-weight:600">📊 View on Raider.IO</a>'
+                    emit(RUN_LINK.format(url=run["url"]))
                 
-                html_content += '</div></div>'
+                emit('</div></div>')
             
-            html_content += '</div>'
+            emit('</div>')
     else:
-        html_content += '<div style="text-align:center;padding:60px"><h2>No M+ Data</h2><p>Run python mplus_enhanced.py to fetch detailed dungeon data</p></div>'
+        emit(NO_MPLUS)
     
     # Raiding Tab
-    html_content += """</div>
-<div id="raiding" class="tab-content">
-<h2 style="margin-bottom:20px">🏆 Warcraft Logs Performance</h2>
-<div class="sort-controls" style="margin-bottom:30px">
-<button class="sort-btn active" onclick="switchDifficulty('mythic')">⚔️ Mythic</button>
-<button class="sort-btn" onclick="switchDifficulty('heroic')">🛡️ Heroic</button>
-</div>
-"""
+    emit(RAIDING_TAB_HEAD)
     
-    if wcl_details:
-        sorted_wcl = sorted([(name, data, next((c for c in characters if c['ID']==name), None)) 
-                            for name, data in wcl_details.items() if data.get('has_logs')], 
-                           key=lambda x: float(str(x[2]['WCL']).replace(',','')) if x[2] and x[2]['WCL']!='N/A' else 0, 
-                           reverse=True)
+    raid_entries = [(name, entry) for name, entry in character_index.items() if entry['wcl'] is not None]
+    if raid_entries:
+        sorted_wcl = sorted([(name, entry) for name, entry in raid_entries if entry['wcl'].get('has_logs')],
+                            key=lambda x: x[1]['wcl_score'], reverse=True)
         
-        for name, wcl_data, char_info in sorted_wcl:
-            if not char_info:
-                continue
-            
-            spec_icon = character_specs.get(name, '')
-            
-            # Get server from character details or use default
-            server = character_servers.get(name, 'azshara') if 'character_servers' in locals() else 'azshara'
-            char_class = char_info['Class']
+        for name, entry in sorted_wcl:
+            char_info = entry['row']
+            wcl_data = entry['wcl']
+            spec_icon = entry['spec_icon']
+            server = entry['server']
             
-            # Generate profile links
-            armory_url = f"https://worldofwarcraft.blizzard.com/ko-kr/character/kr/{server.lower()}/{name.lower()}"
-            raiderio_url = f"https://raider.io/characters/kr/{server}/{name}"
-            wcl_url = f"https://www.warcraftlogs.com/character/kr/{server.lower()}/{name}"
-            
-            # Mythic data
-            mythic_data = wcl_data.get('mythic', {})
-            mythic_perf = mythic_data.get('best_performance', 'N/A')
-            mythic_bosses = mythic_data.get('boss_rankings', [])
-            
-            # Heroic data
-            heroic_data = wcl_data.get('heroic', {})
-            heroic_perf = heroic_data.get('best_performance', 'N/A')
-            heroic_bosses = heroic_data.get('boss_rankings', [])
-            
-            # Use best available performance for color
-            mythic_perf_color = '#808080'
-            heroic_perf_color = '#808080'
-            
-            try:
-                if mythic_perf != 'N/A':
-                    mythic_score = float(str(mythic_perf).replace(',',''))
-                    mythic_perf_color = wcl_color(mythic_score)
-            except:
-                pass
-            
-            try:
-                if heroic_perf != 'N/A':
-                    heroic_score = float(str(heroic_perf).replace(',',''))
-                    heroic_perf_color = wcl_color(heroic_score)
-            except:
-                pass
+            # Best performance badge per difficulty
+            perf = {}
+            for difficulty in ('mythic', 'heroic'):
+                best = wcl_data.get(difficulty, {}).get('best_performance', 'N/A')
+                color = '#808080'
+                try:
+                    if best != 'N/A':
+                        color = wcl_color(float(str(best).replace(',','')))
+                except:
+                    pass
+                perf[difficulty] = (best, color)
             
-            html_content += f'<div class="char-section"><div class="char-header">'
+            emit(RAID_CHAR_HEAD)
             if spec_icon:
-                html_content += f'<img src="{spec_icon}" class="char-avatar" onerror="this.style.display=\'none\'">'
-            html_content += f'<div style="flex:1"><h3>{name}</h3><div style="display:flex;gap:15px;margin-top:10px;flex-wrap:wrap"><span class="badge">{char_info["Spec"]} {char_class}</span><span class="badge" style="background:{mythic_perf_color};color:#fff">Mythic: {mythic_perf}</span><span class="badge" style="background:{heroic_perf_color};color:#fff">Heroic: {heroic_perf}</span></div></div>'
+                emit(RAID_AVATAR.format(spec_icon=spec_icon))
+            emit(RAID_CHAR_BADGES.format(
+                name=name, spec=char_info["Spec"], mythic_perf=perf['mythic'][0], mythic_color=perf['mythic'][1],
+                heroic_perf=perf['heroic'][0], heroic_color=perf['heroic'][1], **{"class": char_info['Class']}
+            ))
             
             # Profile links
-            html_content += f'<div style="display:flex;gap:10px;margin-left:auto"><a href="{armory_url}" target="_blank" title="Armory" style="padding:8px 12px;background:#0070dd;color:#fff;text-decoration:none;border-radius:6px;font-size:0.9em">🛡️</a><a href="{raiderio_url}" target="_blank" title="Raider.IO" style="padding:8px 12px;background:#667eea;color:#fff;text-decoration:none;border-radius:6px;font-size:0.9em">🏔️</a><a href="{wcl_url}" target="_blank" title="Warcraft Logs" style="padding:8px 12px;background:#ff8000;color:#fff;text-decoration:none;border-radius:6px;font-size:0.9em">📊</a></div></div>'
+            emit(RAID_LINKS.format(
+                armory_url=f"https://worldofwarcraft.blizzard.com/ko-kr/character/kr/{server.lower()}/{name.lower()}",
+                raiderio_url=f"https://raider.io/characters/kr/{server}/{name}",
+                wcl_url=f"https://www.warcraftlogs.com/character/kr/{server.lower()}/{name}"
+            ))
             
-            # MYTHIC Boss Rankings
-            if mythic_bosses:
-                html_content += '<div class="difficulty-mythic"><h4 style="margin-bottom:15px;color:#a335ee">⚔️ Mythic Boss Performance</h4>'
-                for boss in mythic_bosses:
-                    boss_name = boss.get('boss', 'Unknown')
+            # Mythic / Heroic Boss Rankings
+            for difficulty in ('mythic', 'heroic'):
+                bosses = wcl_data.get(difficulty, {}).get('boss_rankings', [])
+                if not bosses:
+                    continue
+                emit(DIFFICULTY_HEADS[difficulty])
+                for boss in bosses:
                     rank_pct = boss.get('rank_percent', 0)
-                    best_amount = boss.get('best_amount', 0)
-                    kills = boss.get('total_kills', 0)
-                    
-                    try:
-                        rank_val = float(rank_pct)
-                        boss_color = wcl_color(rank_val)
-                    except:
-                        rank_val = 0
-                        boss_color = '#808080'
-                    
-                    html_content += f'<div class="boss-card" style="border-left-color:{boss_color}"><div style="display:flex;justify-content:space-between;align-items:center"><div><strong>{boss_name}</strong><div style="color:#666;font-size:.9em;margin-top:5px">{kills} kills | Best: {best_amount:,}</div></div><div style="font-size:1.5em;font-weight:bold;color:{boss_color}">{rank_pct}%</div></div><div class="perf-bar" style="background:#e0e0e0"><div class="perf-fill" style="width:{rank_val}%;background:{boss_color}">{rank_pct}%</div></div></div>'
-                html_content += '</div>'
-            
-            # HEROIC Boss Rankings
-            if heroic_bosses:
-                html_content += '<div class="difficulty-heroic" style="display:none"><h4 style="margin-bottom:15px;color:#0070dd">🛡️ Heroic Boss Performance</h4>'
-                for boss in heroic_bosses:
-                    boss_name = boss.get('boss', 'Unknown')
-                    rank_pct = boss.get('rank_percent', 0)
-                    best_amount = boss.get('best_amount', 0)
-                    kills = boss.get('total_kills', 0)
-                    
                     try:
                         rank_val = float(rank_pct)
                         boss_color = wcl_color(rank_val)
@@ -740,119 +926,84 @@ footer{{text-align:center;color:#fff;margin-top:40px}}
                         rank_val = 0
                         boss_color = '#808080'
                     
-                    html_content += f'<div class="boss-card" style="border-left-color:{boss_color}"><div style="display:flex;justify-content:space-between;align-items:center"><div><strong>{boss_name}</strong><div style="color:#666;font-size:.9em;margin-top:5px">{kills} kills | Best: {best_amount:,}</div></div><div style="font-size:1.5em;font-weight:bold;color:{boss_color}">{rank_pct}%</div></div><div class="perf-bar" style="background:#e0e0e0"><div class="perf-fill" style="width:{rank_val}%;background:{boss_color}">{rank_pct}%</div></div></div>'
-                html_content += '</div>'
+                    emit(BOSS_CARD.format(
+                        color=boss_color, boss=boss.get('boss', 'Unknown'), kills=boss.get('total_kills', 0),
+                        best_amount=boss.get('best_amount', 0), rank_pct=rank_pct, rank_val=rank_val
+                    ))
+                emit('</div>')
             
             # All-Stars Summary (show in both modes)
             all_stars = wcl_data.get('all_stars', [])
             if all_stars:
-                html_content += '<h4 style="margin-top:25px;margin-bottom:15px">⭐ All-Stars Points</h4><div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(250px,1fr));gap:15px">'
+                emit(ALLSTARS_HEAD)
                 for star in all_stars:
-                    partition = star.get('partition', 'N/A')
-                    spec = star.get('spec', 'Unknown')
-                    points = star.get('points', 0)
-                    possible = star.get('possible', 0)
                     rank_pct = star.get('rank_percent', 0)
-                    
                     try:
-                        pct_val = (points / possible * 100) if possible > 0 else 0
                         star_color = wcl_color(rank_pct)
                     except:
-                        pct_val = 0
                         star_color = '#808080'
                     
-                    html_content += f'<div style="background:#f8f9fa;padding:15px;border-radius:10px;border:2px solid {star_color}"><div style="font-weight:600;margin-bottom:10px">{spec} - {partition}</div><div style="font-size:1.3em;color:{star_color};font-weight:bold">{points:.1f} / {possible:.1f}</div><div style="color:#666;font-size:.9em;margin-top:5px">Rank: {rank_pct}%</div></div>'
+                    emit(ALLSTAR_CARD.format(
+                        color=star_color, spec=star.get('spec', 'Unknown'), partition=star.get('partition', 'N/A'),
+                        points=star.get('points', 0), possible=star.get('possible', 0), rank_pct=rank_pct
+                    ))
                 
-                html_content += '</div>'
+                emit('</div>')
             
-            html_content += '</div>'
+            emit('</div>')
         
         if not sorted_wcl:
-            html_content += '<div style="text-align:center;padding:60px"><h2>No Raid Logs Available</h2><p>Characters need raid parses on Warcraft Logs</p></div>'
+            emit(NO_RAID_LOGS)
     else:
-        html_content += '<div style="text-align:center;padding:60px"><h2>No Raid Data</h2><p>Run the crawler to fetch Warcraft Logs data</p></div>'
-    
-    html_content += f"""</div>
-</div>
-<div id="modal" class="modal">
-<div class="modal-content">
-<div class="modal-header"><span class="close" onclick="closeModal()">&times;</span><h2 id="modalTitle">Details</h2></div>
-<div class="modal-body" id="modalBody"></div>
-</div>
-</div>
-<footer><p>두부킴의 유기견들</p></footer>
-</div>
-<script>
-const details={json.dumps(character_details)};
-const rosterData={json.dumps(roster_data)};
-let currentSort='name';
-let currentDifficulty='mythic';
-
-function switchDifficulty(diff){{
-    currentDifficulty=diff;
-    document.querySelectorAll('.sort-controls .sort-btn').forEach(b=>b.classList.remove('active'));
-    event.target.classList.add('active');
-    document.querySelectorAll('.difficulty-mythic').forEach(el=>el.style.display=diff==='mythic'?'block':'none');
-    document.querySelectorAll('.difficulty-heroic').forEach(el=>el.style.display=diff==='heroic'?'block':'none');
-}}
-
-function sortRoster(by){{
-    currentSort=by;
-    document.querySelectorAll('.sort-controls .sort-btn').forEach(b=>b.classList.remove('active'));
-    event.target.classList.add('active');
-    
-    let sorted=[...rosterData];
-    if(by==='name')sorted.sort((a,b)=>a.name.localeCompare(b.name));
-    else if(by==='ilvl')sorted.sort((a,b)=>b.ilvl-a.ilvl);
-    else if(by==='mplus')sorted.sort((a,b)=>b.mplus-a.mplus);
-    else if(by==='wcl')sorted.sort((a,b)=>b.wcl-a.wcl);
-    
-    const tbody=document.querySelector('#rosterTable tbody');
-    tbody.innerHTML='';
-    sorted.forEach(rd=>{{
-        const specDisp=rd.spec_icon?`<img src="${{rd.spec_icon}}" style="width:24px;height:24px;vertical-align:middle;margin-right:6px;border-radius:4px" onerror="this.style.display='none'"> ${{rd.spec}}`:rd.spec;
-        const nameDisp=rd.has_detail?`<a href="#" class="clickable" onclick="showChar('${{rd.name}}');return false">${{rd.name}}</a>`:`<b>${{rd.name}}</b>`;
-        tbody.innerHTML+=`<tr><td>${{nameDisp}}</td><td>${{rd.class}}</td><td>${{specDisp}}</td><td>${{rd.ilvl_display}}</td><td>${{rd.mplus_badge}}</td><td>${{rd.wcl_badge}}</td><td>${{rd.links}}</td></tr>`;
-    }});
-}}
-
-function switchTab(e,t){{document.querySelectorAll('.tab-content').forEach(el=>el.classList.remove('active'));document.querySelectorAll('.tab-btn').forEach(el=>el.classList.remove('active'));document.getElementById(t).classList.add('active');e.currentTarget.classList.add('active')}}
-
-function showChar(n){{const m=document.getElementById('modal');document.getElementById('modalTitle').textContent=n;if(details[n]){{let c=details[n],lines=c.split('\\n'),html='',inT=false,rows=[],isEq=false,specIcon='';for(let line of lines){{if(line.startsWith('**SPEC_ICON:')){{specIcon=line.replace('**SPEC_ICON:','').replace('**','').trim();continue}}if(line.includes('## ⚔️ Equipment'))isEq=true;else if(line.startsWith('##'))isEq=false;if(line.trim().startsWith('|')){{if(!inT){{inT=true;rows=[]}}rows.push(line);continue}}else if(inT){{html+=procTable(rows,isEq);inT=false;rows=[]}}if(line.startsWith('# '))html+=`<h2>${{line.substring(2)}}</h2>`;else if(line.startsWith('## '))html+=`<h3>${{line.substring(3)}}</h3>`;else if(line.startsWith('### '))html+=`<h4>${{line.substring(4)}}</h4>`;else if(line.trim()==='---')html+='<hr>';else if(line.trim()==='')html+='<br>';else{{line=line.replace(/\\*\\*(.+?)\\*\\*/g,'<strong>$1</strong>').replace(/\\*(.+?)\\*/g,'<em>$1</em>');if(specIcon&&line.includes('|')&&(line.includes('Tank')||line.includes('Healer')||line.includes('Melee')||line.includes('Ranged')))line=`<img src="${{specIcon}}" style="width:24px;height:24px;vertical-align:middle;margin-right:8px;border-radius:4px;border:2px solid #667eea" onerror="this.style.display='none'"> `+line;html+=`<p>${{line}}</p>`}}}}if(inT)html+=procTable(rows,isEq);document.getElementById('modalBody').innerHTML=html;m.style.display='block'}}}}
-
-function procTable(rows,isEq){{if(!rows.length)return '';let h='<table style="width:100%;border-collapse:collapse;margin:20px 0">';for(let i=0;i<rows.length;i++){{const cells=rows[i].split('|').filter(c=>c.trim());if(cells[0]&&cells[0].includes('---'))continue;if(i===0){{h+='<thead><tr>';cells.forEach((c,idx)=>{{if(!(isEq&&idx===4&&c.trim()==='Icon'))h+=`<th style="background:#667eea;color:#fff;padding:12px">${{c.trim()}}</th>`}});h+='</tr></thead><tbody>'}}else{{h+='<tr>';cells.forEach((c,idx)=>{{if(isEq){{if(idx===1&&cells.length>=5){{const ic=cells[4].trim();if(ic.startsWith('ICON:')){{const url=ic.substring(5);if(url&&url.startsWith('http'))h+=`<td style="padding:12px"><img src="${{url}}" style="width:32px;height:32px;vertical-align:middle;margin-right:8px;border-radius:4px;border:2px solid #667eea" onerror="this.style.display='none'"> ${{c.trim()}}</td>`;else h+=`<td style="padding:12px">${{c.trim()}}</td>`}}else h+=`<td style="padding:12px">${{c.trim()}}</td>`}}else if(idx===3){{const upgrade=c.trim();let color='#667eea';if(upgrade.includes('8/8'))color='#ff8000';else if(upgrade.includes('7/8')||upgrade.includes('6/8'))color='#a335ee';else if(upgrade.includes('5/8')||upgrade.includes('4/8'))color='#0070dd';else if(upgrade.includes('1/8')||upgrade.includes('2/8')||upgrade.includes('3/8'))color='#1eff00';h+=`<td style="padding:12px"><span style="color:${{color}};font-weight:600">${{upgrade}}</span></td>`}}else if(idx!==4)h+=`<td style="padding:12px">${{c.trim()}}</td>`}}else h+=`<td style="padding:12px">${{c.trim()}}</td>`}});h+='</tr>'}}}}return h+'</tbody></table>'}}
-
-function closeModal(){{document.getElementById('modal').style.display='none'}}
-window.onclick=e=>{{if(e.target==document.getElementById('modal'))closeModal()}}
-
-const bg={{beforeDraw:c=>{{const x=c.ctx;x.save();x.fillStyle='#f8f9fa';x.fillRect(0,0,c.width,c.height);x.restore()}}}};
-
-new Chart(document.getElementById('trendChart'),{{type:'line',data:{{labels:{json.dumps(guild_history['dates'])},datasets:[{{label:'ilvl',data:{json.dumps(guild_history['avg_ilvl'])},borderColor:'#667eea',tension:.4,yAxisID:'y1'}},{{label:'M+',data:{json.dumps(guild_history['avg_mplus'])},borderColor:'#FF6B6B',tension:.4,yAxisID:'y2'}},{{label:'WCL',data:{json.dumps(guild_history['avg_wcl'])},borderColor:'#4ECDC4',tension:.4,yAxisID:'y3'}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true,position:'top'}}}},scales:{{y1:{{type:'linear',position:'left',title:{{display:true,text:'ilvl',color:'#667eea'}},ticks:{{color:'#667eea'}}}},y2:{{type:'linear',position:'right',title:{{display:true,text:'M+',color:'#FF6B6B'}},ticks:{{color:'#FF6B6B'}},grid:{{display:false}}}},y3:{{type:'linear',position:'right',title:{{display:true,text:'WCL',color:'#4ECDC4'}},ticks:{{color:'#4ECDC4'}},grid:{{display:false}}}}}}}},plugins:[bg]}});
-
-new Chart(document.getElementById('ilvlChart'),{{type:'bar',data:{{labels:{json.dumps(names)},datasets:[{{label:'Item Level',data:{json.dumps(ilvl_data)},backgroundColor:{json.dumps(colors)},borderColor:'#000000',borderWidth:2}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true}}}},scales:{{x:{{ticks:{{autoSkip:false,maxRotation:0,minRotation:0}}}},y:{{min:720,max:730,title:{{display:true,text:'Item Level'}}}}}}}},plugins:[bg]}});
-
-new Chart(document.getElementById('mplusChart'),{{type:'bar',data:{{labels:{json.dumps(names)},datasets:[{{label:'M+ Score',data:{json.dumps(mplus_data_chart)},backgroundColor:{json.dumps(colors)},borderColor:'#000000',borderWidth:2}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true}}}},scales:{{x:{{ticks:{{autoSkip:false,maxRotation:0,minRotation:0}}}},y:{{title:{{display:true,text:'M+ Score'}}}}}}}},plugins:[bg]}});
-
-const wclNames={json.dumps(wcl_filtered_names)};
-const wclData={json.dumps(wcl_filtered_data)};
-const wclColors={json.dumps(wcl_filtered_colors)};
-
-console.log('WCL Names:', wclNames);
-console.log('WCL Data:', wclData);
-console.log('WCL Colors:', wclColors);
-
-new Chart(document.getElementById('wclChart'),{{type:'bar',data:{{labels:wclNames,datasets:[{{label:'WCL Performance',data:wclData,backgroundColor:wclColors,borderColor:'#000000',borderWidth:2}}]}},options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{display:true,position:'top'}}}},scales:{{x:{{ticks:{{autoSkip:false,maxRotation:0,minRotation:0}}}},y:{{min:0,max:100,title:{{display:true,text:'WCL Percentile'}}}}}}}},plugins:[bg]}});
-</script>
-</body>
-</html>"""
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+        emit(NO_RAID_DATA)
+    
+    # Character details: inlined markdown, or pre-rendered files loaded on demand
+    if split_details:
+        detail_files = write_detail_fragments(character_details, output_file)
+        details_json = '{}'
+        detail_loader = DETAIL_LOADER.format(files=json.dumps(detail_files, ensure_ascii=False))
+        detail_hook = DETAIL_HOOK
+    else:
+        details_json = json.dumps(character_details)
+        detail_loader = detail_hook = ''
+    
+    emit(PAGE_TAIL.format(
+        details=details_json, detail_loader=detail_loader, detail_hook=detail_hook,
+        roster_data=json.dumps(roster_data), roster_order=json.dumps(roster_order),
+        trend_dates=json.dumps(guild_history['dates']), trend_ilvl=json.dumps(guild_history['avg_ilvl']),
+        trend_mplus=json.dumps(guild_history['avg_mplus']), trend_wcl=json.dumps(guild_history['avg_wcl']),
+        names=json.dumps(names), ilvl_data=json.dumps(ilvl_data), mplus_data=json.dumps(mplus_data_chart),
+        colors=json.dumps(colors), wcl_names=json.dumps(wcl_filtered_names),
+        wcl_data=json.dumps(wcl_filtered_data), wcl_colors=json.dumps(wcl_filtered_colors)
+    ))
+    
+    tmp_path = output_file + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(html_chunks)
+    os.replace(tmp_path, output_file)
+    
+    elapsed = time.perf_counter() - render_started
+    render_stats = f"⏱️ Rendered {len(html_chunks)} chunks in {elapsed:.2f}s"
+    if profile_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+        render_stats += f" (peak memory {peak_memory / 1024 / 1024:.1f} MB, timed under tracemalloc)"
     
     print(f"✅ Dashboard generated: {output_file}")
     print(f"   - 5 tabs (Overview, Roster, Charts, M+ Details, Raiding)")
     print(f"   - Roster with sortable columns (Name/ilvl/M+/WCL)")
     print(f"   - M+ scores colored by Raider.IO standard")
+    if split_details:
+        print(f"   - Character details: {len(detail_files)} files loaded on demand ({os.path.getsize(output_file) / 1024:.0f} KB page)")
+    print(render_stats)
 
 if __name__ == "__main__":
-    generate_html_dashboard("logs/Player_data.csv")
+    parser = argparse.ArgumentParser(description="Generate the guild dashboard")
+    parser.add_argument("--split-details", action="store_true",
+                        help="Write character details to separate files loaded when opened")
+    parser.add_argument("--profile", action="store_true",
+                        help="Also report the render's peak memory (traced with tracemalloc)")
+    args = parser.parse_args()
+    generate_html_dashboard("logs/Player_data.csv", split_details=args.split_details or None,
+                            profile_memory=args.profile or None)
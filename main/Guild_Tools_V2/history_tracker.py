@@ -1,24 +1,274 @@
 import csv
 import os
 import json
+import sqlite3
 from datetime import datetime
 from collections import defaultdict
+from contextlib import contextmanager
 
-HISTORY_FILE = "logs/history.json"
+import numpy as np
+
+HISTORY_FILE = "logs/history.json"  # Legacy store, migrated into HISTORY_DB_FILE on first use
+HISTORY_DB_FILE = "logs/history.db"
 CURRENT_DATA_FILE = "logs/Player_data.csv"
 
-def load_history():
-    """Load historical data from JSON file"""
+METRICS = ('ilvl', 'mplus', 'wcl')
+IMPROVEMENT_WEIGHTS = np.array([2, 0.01, 0.5])  # ilvl, M+, WCL gain weights in the improvement score
+IMPROVER_WINDOWS = {'7d': 7, '14d': 14, '30d': 30, 'season': None}  # Snapshots back (None = whole history)
+
+def connect_history():
+    """Open the SQLite history store, creating and migrating it on first use"""
+    os.makedirs(os.path.dirname(HISTORY_DB_FILE) or ".", exist_ok=True)
+    conn = sqlite3.connect(HISTORY_DB_FILE)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            date TEXT NOT NULL,
+            character TEXT NOT NULL,
+            ilvl REAL NOT NULL,
+            mplus REAL NOT NULL,
+            wcl REAL NOT NULL,
+            class TEXT,
+            spec TEXT,
+            PRIMARY KEY (date, character)
+        );
+        CREATE INDEX IF NOT EXISTS idx_snapshots_character_date ON snapshots (character, date);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """)
+    migrate_json_history(conn)
+    return conn
+
+@contextmanager
+def history_db():
+    """Connection that commits on success and is always closed"""
+    conn = connect_history()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def migrate_json_history(conn):
+    """One-time import of the old logs/history.json"""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+        return
     if os.path.exists(HISTORY_FILE):
         with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+            legacy = json.load(f)
+        for date, snapshot in legacy.items():
+            _write_snapshot(conn, date, snapshot)
+        print(f"📦 Migrated {len(legacy)} snapshots from {HISTORY_FILE}")
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (datetime.now().isoformat(),))
+    conn.commit()
+
+def _write_snapshot(conn, date, snapshot):
+    """Replace one day's snapshot (rows keep the snapshot's character order)"""
+    conn.execute("DELETE FROM snapshots WHERE date = ?", (date,))
+    conn.executemany(
+        "INSERT INTO snapshots (date, character, ilvl, mplus, wcl, class, spec) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(date, name, data['ilvl'], data['mplus'], data['wcl'], data.get('class'), data.get('spec'))
+         for name, data in snapshot.items()]
+    )
+
+def _read_snapshots(conn):
+    """All snapshots as {date: {character: data}}, dates ascending"""
+    history = defaultdict(dict)
+    rows = conn.execute(
+        "SELECT date, character, ilvl, mplus, wcl, class, spec FROM snapshots ORDER BY date, rowid"
+    ).fetchall()
+    for date, name, ilvl, mplus, wcl, char_class, spec in rows:
+        history[date][name] = {'ilvl': ilvl, 'mplus': mplus, 'wcl': wcl, 'class': char_class, 'spec': spec}
+    return dict(history)
+
+class HistoryMatrix:
+    """History as a (date × character × metric) masked array.
+
+    Missing snapshot entries are masked, so guild averages, deltas between
+    two dates and improvement scores are plain array operations instead of
+    loops over dicts of dicts.
+    """
+    
+    def __init__(self, dates, characters, values, present, info, newest_order):
+        self.dates = dates
+        self.characters = characters
+        self.columns = {name: i for i, name in enumerate(characters)}
+        self.present = present                                    # bool (date, character)
+        self.values = np.ma.masked_array(values, mask=np.repeat(~present[:, :, None], len(METRICS), axis=2))
+        self.info = info                                          # {name: (class, spec)} from latest snapshot
+        self.newest_order = newest_order                          # Columns in the newest snapshot's order
+    
+    @classmethod
+    def from_snapshots(cls, snapshots):
+        """Build from {date: {character: data}} with dates ascending"""
+        dates = list(snapshots)
+        characters = list(dict.fromkeys(name for snapshot in snapshots.values() for name in snapshot))
+        columns = {name: i for i, name in enumerate(characters)}
+        values = np.zeros((len(dates), len(characters), len(METRICS)))
+        present = np.zeros((len(dates), len(characters)), dtype=bool)
+        info = {}
+        
+        for row, snapshot in enumerate(snapshots.values()):
+            if not snapshot:
+                continue
+            cols = [columns[name] for name in snapshot]
+            values[row, cols] = [[data[metric] for metric in METRICS] for data in snapshot.values()]
+            present[row, cols] = True
+            info.update((name, (data.get('class'), data.get('spec'))) for name, data in snapshot.items())
+        
+        newest_order = [columns[name] for name in snapshots[dates[-1]]] if dates else []
+        return cls(dates, characters, values, present, info, newest_order)
+    
+    def appended(self, date, snapshot):
+        """New matrix with one more snapshot after the last date"""
+        characters = self.characters + [name for name in snapshot if name not in self.columns]
+        columns = {name: i for i, name in enumerate(characters)}
+        values = np.zeros((len(self.dates) + 1, len(characters), len(METRICS)))
+        present = np.zeros((len(self.dates) + 1, len(characters)), dtype=bool)
+        values[:-1, :len(self.characters)] = self.values.data
+        present[:-1, :len(self.characters)] = self.present
+        
+        cols = [columns[name] for name in snapshot]
+        if cols:
+            values[-1, cols] = [[data[metric] for metric in METRICS] for data in snapshot.values()]
+            present[-1, cols] = True
+        info = dict(self.info)
+        info.update((name, (data.get('class'), data.get('spec'))) for name, data in snapshot.items())
+        return HistoryMatrix(self.dates + [date], characters, values, present, info, cols)
+    
+    def guild_averages(self):
+        """(date, metric) averages over characters with a value > 0 (0 when nobody has one)"""
+        positive = np.ma.masked_less_equal(self.values, 0)
+        return positive.mean(axis=1).filled(0) if self.dates else np.zeros((0, len(METRICS)))
+    
+    def improvers(self, windows, limit=10):
+        """Top improvers for several windows in one pass; {label: [improver dicts]}"""
+        count = len(self.dates)
+        if count < 2 or not windows:
+            return {label: [] for label in windows}
+        
+        # Oldest snapshot index per window, then all deltas / scores at once
+        spans = np.array([count - 1 if days is None else min(days, count - 1) for days in windows.values()])
+        oldest = (count - 1) - spans
+        deltas = self.values[-1][None, :, :] - self.values[oldest]    # (window, character, metric)
+        scores = (deltas * IMPROVEMENT_WEIGHTS).sum(axis=2)           # (window, character)
+        
+        order = np.array(self.newest_order, dtype=int)
+        results = {}
+        for w, label in enumerate(windows):
+            # Characters in the newest snapshot that also exist in the window's oldest one
+            cols = order[self.present[oldest[w], order]]
+            ranked = cols[np.argsort(-scores[w, cols].data, kind='stable')][:limit]
+            results[label] = [{
+                'name': self.characters[col],
+                'class': self.info[self.characters[col]][0],
+                'spec': self.info[self.characters[col]][1],
+                'ilvl_gain': float(deltas[w, col, 0]),
+                'mplus_gain': float(deltas[w, col, 1]),
+                'wcl_gain': float(deltas[w, col, 2]),
+                'score': float(scores[w, col])
+            } for col in ranked]
+        return results
+    
+    def window_range(self, days):
+        """(oldest_date, newest_date) compared for a window"""
+        span = len(self.dates) - 1 if days is None else min(days, len(self.dates) - 1)
+        return self.dates[-1 - span], self.dates[-1]
+
+class HistoryRepository:
+    """Process-wide cache of the history store.
+
+    Snapshots are loaded once and reused by update_history, the Discord post
+    and the dashboard; a change to history.db's mtime/size (another process
+    wrote to it) triggers a reload. The HistoryMatrix is extended in place
+    of a rebuild when a newer snapshot is added, and top improvers are
+    memoized per window.
+    """
+    
+    def __init__(self, path=HISTORY_DB_FILE):
+        self.path = path
+        self._snapshots = None
+        self._matrix = None
+        self._improvers = {}
+        self._signature = None
+    
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def snapshots(self):
+        """{date: {character: data}}, reloaded only when the store changed on disk"""
+        if self._snapshots is None or self._file_signature() != self._signature:
+            with history_db() as conn:
+                self._snapshots = _read_snapshots(conn)
+            self._matrix = HistoryMatrix.from_snapshots(self._snapshots)
+            self._improvers = {}
+            self._signature = self._file_signature()
+        return self._snapshots
+    
+    def matrix(self):
+        self.snapshots()
+        return self._matrix
+    
+    def add_snapshot(self, date, snapshot):
+        """Store one day's snapshot; returns the total number of snapshots"""
+        snapshots = self.snapshots()
+        with history_db() as conn:
+            _write_snapshot(conn, date, snapshot)
+        
+        if snapshots and date > list(snapshots)[-1]:
+            snapshots[date] = snapshot
+            self._matrix = self._matrix.appended(date, snapshot)
+        else:
+            snapshots[date] = snapshot
+            self._snapshots = dict(sorted(snapshots.items()))
+            self._matrix = HistoryMatrix.from_snapshots(self._snapshots)
+        self._improvers = {}
+        self._signature = self._file_signature()
+        return len(self._snapshots)
+    
+    def guild_average_history(self):
+        matrix = self.matrix()
+        averages = matrix.guild_averages()
+        return {
+            'dates': list(matrix.dates),
+            'avg_ilvl': averages[:, 0].tolist(),
+            'avg_mplus': averages[:, 1].tolist(),
+            'avg_wcl': averages[:, 2].tolist()
+        }
+    
+    def improvers_by_window(self, windows=None):
+        """Top improvers for every window, e.g. {'7d': [...], 'season': [...]}"""
+        windows = IMPROVER_WINDOWS if windows is None else windows
+        matrix = self.matrix()
+        missing = {label: days for label, days in windows.items() if days not in self._improvers}
+        for label, improvers in matrix.improvers(missing).items():
+            self._improvers[missing[label]] = improvers
+        return {label: self._improvers[days] for label, days in windows.items()}
+    
+    def top_improvers(self, days=7):
+        matrix = self.matrix()
+        if len(matrix.dates) < 2:
+            print("⚠️ Need at least 2 snapshots to calculate improvements")
+            return []
+        
+        oldest_date, newest_date = matrix.window_range(days)
+        print(f"📊 Comparing {oldest_date} → {newest_date}")
+        return self.improvers_by_window({days: days})[days]
+
+history_repository = HistoryRepository()
+
+def load_history():
+    """Load all historical data as {date: {character: data}}"""
+    with history_db() as conn:
+        return _read_snapshots(conn)
 
 def save_history(history):
-    """Save historical data to JSON file"""
-    os.makedirs("logs", exist_ok=True)
-    with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
+    """Replace the stored snapshots for every date in history"""
+    with history_db() as conn:
+        for date, snapshot in history.items():
+            _write_snapshot(conn, date, snapshot)
 
 def add_current_snapshot():
     """Add current data as a new snapshot in history"""
@@ -47,35 +297,22 @@ def add_current_snapshot():
         print("❌ No valid character data found")
         return False
     
-    # Load history
-    history = load_history()
-    
     # Get current timestamp
     timestamp = datetime.now().strftime('%Y-%m-%d')
     
     # Check if we already have data for today (don't duplicate)
-    if timestamp in history:
+    if timestamp in history_repository.snapshots():
         print(f"⚠️ Data for {timestamp} already exists. Updating...")
     
-    # Add current snapshot
-    history[timestamp] = current_data
-    
-    # Keep only last 30 days
-    dates = sorted(history.keys())
-    if len(dates) > 30:
-        for old_date in dates[:-30]:
-            del history[old_date]
+    # Add current snapshot (full history is kept - no retention cap)
+    total = history_repository.add_snapshot(timestamp, current_data)
     
-    # Save updated history
-    save_history(history)
     print(f"✅ Snapshot added for {timestamp}")
-    print(f"📊 Total snapshots: {len(history)}")
+    print(f"📊 Total snapshots: {total}")
     return True
 
 def get_character_history(character_name):
     """Get historical data for a specific character"""
-    history = load_history()
-    
     char_history = {
         'dates': [],
         'ilvl': [],
@@ -83,84 +320,31 @@ def get_character_history(character_name):
         'wcl': []
     }
     
-    for date in sorted(history.keys()):
-        if character_name in history[date]:
-            char_data = history[date][character_name]
-            char_history['dates'].append(date)
-            char_history['ilvl'].append(char_data['ilvl'])
-            char_history['mplus'].append(char_data['mplus'])
-            char_history['wcl'].append(char_data['wcl'])
+    with history_db() as conn:
+        rows = conn.execute(
+            "SELECT date, ilvl, mplus, wcl FROM snapshots WHERE character = ? ORDER BY date",
+            (character_name,)
+        ).fetchall()
+    
+    for date, ilvl, mplus, wcl in rows:
+        char_history['dates'].append(date)
+        char_history['ilvl'].append(ilvl)
+        char_history['mplus'].append(mplus)
+        char_history['wcl'].append(wcl)
     
     return char_history
 
 def get_guild_average_history():
     """Get guild average trends over time"""
-    history = load_history()
-    
-    guild_history = {
-        'dates': [],
-        'avg_ilvl': [],
-        'avg_mplus': [],
-        'avg_wcl': []
-    }
-    
-    for date in sorted(history.keys()):
-        ilvls = [data['ilvl'] for data in history[date].values() if data['ilvl'] > 0]
-        mplus = [data['mplus'] for data in history[date].values() if data['mplus'] > 0]
-        wcl = [data['wcl'] for data in history[date].values() if data['wcl'] > 0]
-        
-        guild_history['dates'].append(date)
-        guild_history['avg_ilvl'].append(sum(ilvls) / len(ilvls) if ilvls else 0)
-        guild_history['avg_mplus'].append(sum(mplus) / len(mplus) if mplus else 0)
-        guild_history['avg_wcl'].append(sum(wcl) / len(wcl) if wcl else 0)
-    
-    return guild_history
+    return history_repository.guild_average_history()
 
 def get_top_improvers(days=7):
     """Get characters with biggest improvements in last N days"""
-    history = load_history()
-    dates = sorted(history.keys())
-    
-    if len(dates) < 2:
-        print("⚠️ Need at least 2 snapshots to calculate improvements")
-        return []
-    
-    # Get recent dates (last N days)
-    recent_dates = dates[-min(days + 1, len(dates)):]
-    oldest_date = recent_dates[0]
-    newest_date = recent_dates[-1]
-    
-    print(f"📊 Comparing {oldest_date} → {newest_date}")
-    
-    improvements = []
-    
-    # Find characters that exist in both snapshots
-    for char_name in history[newest_date].keys():
-        if char_name in history[oldest_date]:
-            old_data = history[oldest_date][char_name]
-            new_data = history[newest_date][char_name]
-            
-            ilvl_gain = new_data['ilvl'] - old_data['ilvl']
-            mplus_gain = new_data['mplus'] - old_data['mplus']
-            wcl_gain = new_data['wcl'] - old_data['wcl']
-            
-            # Calculate improvement score (weighted)
-            improvement_score = (ilvl_gain * 2) + (mplus_gain * 0.01) + (wcl_gain * 0.5)
-            
-            improvements.append({
-                'name': char_name,
-                'class': new_data['class'],
-                'spec': new_data['spec'],
-                'ilvl_gain': ilvl_gain,
-                'mplus_gain': mplus_gain,
-                'wcl_gain': wcl_gain,
-                'score': improvement_score
-            })
-    
-    # Sort by improvement score
-    improvements.sort(key=lambda x: x['score'], reverse=True)
-    
-    return improvements[:10]  # Top 10
+    return history_repository.top_improvers(days)
+
+def get_improvers_by_window(windows=None):
+    """Top improvers for each window in IMPROVER_WINDOWS (7d/14d/30d/season)"""
+    return history_repository.improvers_by_window(windows)
 
 if __name__ == "__main__":
     print("📊 Historical Data Tracker\n")
@@ -193,3 +377,10 @@ if __name__ == "__main__":
             print(f"      ilvl: +{player['ilvl_gain']:.1f} | M+: +{player['mplus_gain']:.0f} | WCL: +{player['wcl_gain']:.1f}")
     else:
         print("   No improvement data yet (need multiple snapshots)")
+    
+    # Best improver per window
+    print("\n📅 Best Improver by Window:")
+    for label, window_improvers in get_improvers_by_window().items():
+        if window_improvers:
+            best = window_improvers[0]
+            print(f"   {label}: {best['name']} (score {best['score']:.1f})")
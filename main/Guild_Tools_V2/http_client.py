@@ -0,0 +1,186 @@
+import os
+import time
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+# ────────────────────────────────────────────────
+# Settings
+# Connection pool size per API host (max keep-alive connections kept open)
+HOST_POOL_SIZES = {
+    "kr.battle.net": 2,
+    f"{os.getenv('REGION', 'kr')}.api.blizzard.com": int(os.getenv("POOL_SIZE_BLIZZARD", "20")),
+    "raider.io": int(os.getenv("POOL_SIZE_RAIDERIO", "10")),
+    "www.warcraftlogs.com": int(os.getenv("POOL_SIZE_WCL", "10")),
+}
+DEFAULT_POOL_SIZE = 5
+
+# Request rate per API host (requests/second), shared by all threads and async tasks
+HOST_RATE_LIMITS = {
+    f"{os.getenv('REGION', 'kr')}.api.blizzard.com": float(os.getenv("RATE_LIMIT_BLIZZARD", "50")),
+    "raider.io": float(os.getenv("RATE_LIMIT_RAIDERIO", "4")),
+    "www.warcraftlogs.com": float(os.getenv("RATE_LIMIT_WCL", "5")),
+}
+
+# ────────────────────────────────────────────────
+# Rate Limiting
+class TokenBucket:
+    """Thread-safe token bucket that adapts its rate to server feedback.
+
+    429 responses halve the rate and pause the bucket for Retry-After;
+    each success adds back a small step until the configured ceiling.
+    Blizzard's X-Plan-QPS/Quota headers lower the ceiling when they are
+    stricter than our own setting.
+    """
+
+    def __init__(self, rate, burst=None, min_rate=0.5):
+        self.configured_rate = rate
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_throttle(self, retry_after=None):
+        """Back off after a 429: halve the rate and pause for Retry-After"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+    def on_success(self):
+        """Additive increase back towards the ceiling"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def apply_quota(self, qps_allotted=None, quota_allotted=None, quota_current=None):
+        """Clamp to server-advertised limits; returns True if the quota is used up"""
+        with self._lock:
+            if qps_allotted:
+                self.max_rate = max(self.min_rate, min(self.configured_rate, qps_allotted))
+                self.rate = min(self.rate, self.max_rate)
+            if quota_allotted and quota_current is not None and quota_current >= quota_allotted:
+                self.rate = self.min_rate
+                return True
+            return False
+
+def parse_retry_after(value, default=None):
+    """Retry-After header as seconds (numeric form only)"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
+def _header_number(headers, name):
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+# ────────────────────────────────────────────────
+# Pooled HTTP Client
+class HttpClient:
+    """Shared keep-alive HTTP client with one connection pool per API host.
+
+    Sessions are created lazily per host and reused by every thread, so
+    repeated Blizzard / Raider.IO / WCL calls skip the TCP+TLS handshake.
+    The underlying urllib3 pools are thread-safe; the lock only guards
+    session creation. Every request first takes a token from the host's
+    TokenBucket.
+    """
+
+    def __init__(self, pool_sizes=None, rate_limits=None):
+        self.pool_sizes = dict(HOST_POOL_SIZES if pool_sizes is None else pool_sizes)
+        rate_limits = HOST_RATE_LIMITS if rate_limits is None else rate_limits
+        self.limiters = {host: TokenBucket(rate) for host, rate in rate_limits.items() if rate > 0}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get_limiter(self, url):
+        """Token bucket for the host of this URL (None if unlimited)"""
+        return self.limiters.get(urlsplit(url).netloc)
+
+    def _observe(self, limiter, resp):
+        """Feed response status / quota headers back into the host's limiter"""
+        if resp.status_code == 429:
+            limiter.on_throttle(parse_retry_after(resp.headers.get("Retry-After"), 1.0))
+            return
+        headers = resp.headers
+        qps_allotted = _header_number(headers, "X-Plan-QPS-Allotted")
+        quota_allotted = _header_number(headers, "X-Plan-Quota-Allotted")
+        exhausted = False
+        if qps_allotted or quota_allotted:
+            exhausted = limiter.apply_quota(qps_allotted, quota_allotted, _header_number(headers, "X-Plan-Quota-Current"))
+        if resp.status_code < 400 and not exhausted:
+            limiter.on_success()  # Hold the quota clamp while the quota is used up
+
+    def get_session(self, url):
+        """Get (or create) the pooled session for the host of this URL"""
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                pool_size = self.pool_sizes.get(host, DEFAULT_POOL_SIZE)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the host's pooled session and rate limiter"""
+        limiter = self.get_limiter(url)
+        if limiter is None:
+            return self.get_session(url).request(method, url, **kwargs)
+
+        limiter.acquire()
+        resp = self.get_session(url).request(method, url, **kwargs)
+        self._observe(limiter, resp)
+        return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+http_client = HttpClient()
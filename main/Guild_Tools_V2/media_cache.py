@@ -0,0 +1,116 @@
+import os
+import time
+import sqlite3
+import threading
+
+# ────────────────────────────────────────────────
+# Settings
+MEDIA_CACHE_FILE = os.path.join("logs", "media_cache.db")
+MEDIA_CACHE_TTL_DAYS = float(os.getenv("MEDIA_CACHE_TTL_DAYS", "30"))
+
+# ────────────────────────────────────────────────
+# Persistent Media Cache
+class MediaCache:
+    """Persistent key-value cache for Blizzard static media URLs.
+
+    Entries are keyed by (kind, media id), e.g. ("item", 212345) or
+    ("spec", 73), and expire after ttl_days. Safe to share across the
+    crawler's worker threads.
+    """
+
+    def __init__(self, path=MEDIA_CACHE_FILE, ttl_days=MEDIA_CACHE_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                " kind TEXT NOT NULL,"
+                " media_id TEXT NOT NULL,"
+                " url TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (kind, media_id))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, kind, media_id):
+        """Return cached URL, or None on miss/expiry"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT url, fetched_at FROM media WHERE kind = ? AND media_id = ?",
+                (kind, str(media_id))
+            ).fetchone()
+            if row and time.time() - row[1] < self.ttl:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, kind, media_id, url):
+        """Store URL for a media id"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO media (kind, media_id, url, fetched_at) VALUES (?, ?, ?, ?)",
+                (kind, str(media_id), url, time.time())
+            )
+            conn.commit()
+
+    def invalidate(self, kind=None, media_id=None):
+        """Drop one entry, one kind, or everything; returns rows removed"""
+        with self._lock:
+            conn = self._connect()
+            if kind is None:
+                cur = conn.execute("DELETE FROM media")
+            elif media_id is None:
+                cur = conn.execute("DELETE FROM media WHERE kind = ?", (kind,))
+            else:
+                cur = conn.execute("DELETE FROM media WHERE kind = ? AND media_id = ?", (kind, str(media_id)))
+            conn.commit()
+            return cur.rowcount
+
+    def purge_expired(self):
+        """Remove entries older than the TTL"""
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute("DELETE FROM media WHERE fetched_at < ?", (time.time() - self.ttl,))
+            conn.commit()
+            return cur.rowcount
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+media_cache = MediaCache()
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        kind = sys.argv[2] if len(sys.argv) > 2 else None
+        media_id = sys.argv[3] if len(sys.argv) > 3 else None
+        removed = media_cache.invalidate(kind, media_id)
+        print(f"🗑️ Removed {removed} cached media entries")
+    else:
+        removed = media_cache.purge_expired()
+        print(f"🧹 Purged {removed} expired media entries")
+        print("💡 Usage: python media_cache.py clear [item|spec] [id]")
@@ -1,28 +1,27 @@
-import requests
-import json
 import os
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_client import http_client
+from raiderio import raiderio_profiles
+from mplus_store import MPLUS_JSONL_FILE, MplusWriter, MplusReader, mplus_run_store
 
 REGION = os.getenv("REGION", "kr")
+MPLUS_WORKERS = int(os.getenv("MPLUS_WORKERS", "8"))  # Concurrent Raider.IO lookups (rate limited per host)
+MPLUS_TIMEOUT = float(os.getenv("MPLUS_TIMEOUT", "15"))  # Per-character request timeout (seconds)
+
+def request_profile(url, params):
+    """Raider.IO profile request over the pooled client"""
+    response = http_client.get(url, params=params, timeout=MPLUS_TIMEOUT)
+    if response.status_code != 200:
+        print(f"  ⚠️ API returned {response.status_code}")
+    return response
 
 def get_character_recent_mplus(server, character):
-    """Get recent M+ runs (instead of best runs)"""
-    url = "https://raider.io/api/v1/characters/profile"
-    params = {
-        "region": REGION,
-        "realm": server,
-        "name": character,
-        "fields": "mythic_plus_scores_by_season:current,mythic_plus_recent_runs,gear"
-    }
-    
+    """Get recent M+ runs (instead of best runs); reuses the crawler's payload from this run"""
     try:
-        response = requests.get(url, params=params, timeout=15)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"  ⚠️ API returned {response.status_code}")
-            return None
+        return raiderio_profiles.get_profile(server, character, request_profile)
     except Exception as e:
         print(f"  ❌ Error: {e}")
         return None
@@ -87,12 +86,12 @@ def analyze_recent_runs(server, character):
     # Get recent runs
     recent_runs = data.get("mythic_plus_recent_runs", [])
     
-    # Sort by completion time (most recent first)
-    recent_runs.sort(key=lambda x: x.get("completed_at", ""), reverse=True)
+    # Sort by completion time (most recent first) - copy, the payload is shared via the run cache
+    recent_runs = sorted(recent_runs, key=lambda x: x.get("completed_at", ""), reverse=True)
     
-    # Get top 10 recent runs
+    # Format every recent run (all go to the run store, top 10 to the report)
     best_runs = []
-    for run in recent_runs[:10]:
+    for run in recent_runs:
         # Calculate upgrade level
         num_upgrades = run.get("num_keystone_upgrades", 0)
         upgrade_text = ""
@@ -135,55 +134,71 @@ def analyze_recent_runs(server, character):
         
         best_runs.append(run_data)
     
-    print(f"  ✅ Found {len(best_runs)} recent runs (score: {score:.1f})")
+    # Merge into the season-long run store (only runs newer than the last ingest)
+    new_runs = mplus_run_store.ingest(character, best_runs)
+    best_runs = best_runs[:10]
+    
+    print(f"  ✅ Found {len(best_runs)} recent runs (score: {score:.1f}, {new_runs} new stored)")
     
     return {
         "character": char_info,
         "best_runs": best_runs  # Keep same key name for compatibility
     }
 
-def save_recent_mplus_data(csv_file="characters.csv"):
-    """Fetch and save recent M+ data"""
+def save_recent_mplus_data(csv_file="characters.csv", workers=MPLUS_WORKERS):
+    """Fetch and save recent M+ data; returns a lazy MplusReader over the saved file"""
     import csv
     
     if not os.path.exists(csv_file):
         print(f"❌ CSV file not found: {csv_file}")
         return None
     
-    characters_mplus = {}
-    
     with open(csv_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         characters = list(reader)
     
-    print(f"\n🏔️ Fetching recent M+ runs for {len(characters)} characters...")
+    print(f"\n🏔️ Fetching recent M+ runs for {len(characters)} characters ({workers} workers)...")
     print("="*60 + "\n")
-    
-    for i, row in enumerate(characters, 1):
-        server = row['Server'].strip()
-        character = row['ID'].strip()
-        
-        print(f"[{i}/{len(characters)}] {character}@{server}")
-        char_data = analyze_recent_runs(server, character)
-        
-        if char_data:
-            characters_mplus[character] = char_data
-        else:
-            print(f"  ⚠️ No data available")
-        
-        # Rate limit protection
-        time.sleep(0.3)
-        print()
-    
-    # Save to JSON
-    os.makedirs("logs", exist_ok=True)
-    with open("logs/mplus_enhanced.json", 'w', encoding='utf-8') as f:
-        json.dump(characters_mplus, f, indent=2, ensure_ascii=False)
-    
-    print(f"\n✅ Recent M+ data saved to logs/mplus_enhanced.json")
+    start_time = time.time()
+    reused_before, fetched_before = raiderio_profiles.reused, raiderio_profiles.fetched
+    
+    # Each character is streamed to the JSON Lines file as soon as it completes
+    writer = MplusWriter()
+    writer.open()
+    
+    # Raider.IO pacing is handled by the shared per-host rate limiter
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(analyze_recent_runs, row['Server'].strip(), row['ID'].strip()): i
+            for i, row in enumerate(characters)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            character = characters[i]['ID'].strip()
+            try:
+                char_data = future.result()
+            except Exception as e:
+                print(f"  ❌ {character}: {e}")
+                char_data = None
+            
+            if char_data:
+                writer.append(i, character, char_data)
+            else:
+                print(f"  ⚠️ No data available for {character}")
+            print(f"[{done}/{len(characters)}] {character} done")
+    
+    # Index keeps characters.csv order
+    writer.close()
+    
+    raiderio_profiles.save()
+    print(f"\n⏱️ Fetched in {time.time() - start_time:.1f}s "
+          f"(Raider.IO: {raiderio_profiles.reused - reused_before} reused from this run, "
+          f"{raiderio_profiles.fetched - fetched_before} fetched)")
+    
+    print(f"\n✅ Recent M+ data for {len(writer)} characters saved to {MPLUS_JSONL_FILE}")
     print("="*60)
     
-    return characters_mplus
+    return MplusReader()
 
 if __name__ == "__main__":
     print("🏔️ Recent M+ Runs Fetcher\n")
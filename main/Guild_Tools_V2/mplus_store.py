@@ -0,0 +1,312 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+
+# ────────────────────────────────────────────────
+# Settings
+MPLUS_JSONL_FILE = os.path.join("logs", "mplus_enhanced.jsonl")
+MPLUS_INDEX_FILE = os.path.join("logs", "mplus_enhanced.idx.json")
+MPLUS_LEGACY_FILE = os.path.join("logs", "mplus_enhanced.json")
+MPLUS_RUNS_DB_FILE = os.path.join("logs", "mplus_runs.db")
+
+RUN_URL_PATTERN = re.compile(r"/mythic-plus-runs/([^/]+)/(\d+)")
+
+def _score(data):
+    return (data or {}).get("character", {}).get("score", 0) or 0
+
+# ────────────────────────────────────────────────
+# Streaming M+ Output
+class MplusWriter:
+    """Writes M+ details as JSON Lines, one character per line, as they complete.
+
+    Each line is flushed immediately so readers can start before the fetch
+    finishes. close() writes a byte-offset index (in characters.csv order,
+    with each character's score) so readers can seek to a single character
+    or sort by score without parsing every line.
+    """
+
+    def __init__(self, path=MPLUS_JSONL_FILE, index_path=MPLUS_INDEX_FILE):
+        self.path = path
+        self.index_path = index_path
+        self.entries = {}  # position -> index entry
+        self._file = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)  # Stale until close() writes the new one
+        self._file = open(self.path, "wb")
+
+    def append(self, position, name, data):
+        """Write one character; position is its row in characters.csv"""
+        line = (json.dumps({"name": name, "data": data}, ensure_ascii=False) + "\n").encode("utf-8")
+        offset = self._file.tell()
+        self._file.write(line)
+        self._file.flush()
+        self.entries[position] = {"name": name, "offset": offset, "length": len(line), "score": _score(data)}
+
+    def close(self):
+        """Finish the file and write the index atomically"""
+        if self._file is None:
+            return
+        size = self._file.tell()
+        self._file.close()
+        self._file = None
+
+        # characters.csv order; a repeated name keeps its first position and last data
+        by_name = {}
+        for position in sorted(self.entries):
+            entry = self.entries[position]
+            by_name[entry["name"]] = entry
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"size": size, "entries": list(by_name.values())}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def __len__(self):
+        return len(self.entries)
+
+class MplusReader:
+    """Lazy, dict-like reader for the M+ JSON Lines file.
+
+    Uses the byte-offset index when it matches the data file; otherwise
+    (fetch still running, or index missing) scans complete lines in file
+    order. Only the requested characters are ever parsed.
+    """
+
+    def __init__(self, path=MPLUS_JSONL_FILE, index_path=MPLUS_INDEX_FILE):
+        self.path = path
+        self.index_path = index_path
+        self._entries = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def index(self):
+        """Index entries: name, offset, length, score"""
+        if self._entries is None:
+            self._entries = self._load_index() or self._scan()
+        return self._entries
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path) or not self.exists():
+            return None
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("size") != os.path.getsize(self.path):
+            return None
+        return index["entries"]
+
+    def _scan(self):
+        by_name = {}
+        if not self.exists():
+            return []
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Still being written
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                by_name[record["name"]] = {"name": record["name"], "offset": offset,
+                                           "length": len(line), "score": _score(record["data"])}
+                offset += len(line)
+        return list(by_name.values())
+
+    def _read(self, f, entry):
+        f.seek(entry["offset"])
+        return json.loads(f.read(entry["length"]))["data"]
+
+    def get(self, name, default=None):
+        for entry in self.index():
+            if entry["name"] == name:
+                with open(self.path, "rb") as f:
+                    return self._read(f, entry)
+        return default
+
+    def items(self, entries=None):
+        """Yield (name, data) lazily, in index order unless entries are given"""
+        entries = self.index() if entries is None else entries
+        with open(self.path, "rb") as f:
+            for entry in entries:
+                yield entry["name"], self._read(f, entry)
+
+    def by_score(self):
+        """Yield (name, data) from highest M+ score to lowest"""
+        return self.items(sorted(self.index(), key=lambda entry: entry["score"], reverse=True))
+
+    def __len__(self):
+        return len(self.index())
+
+    def __contains__(self, name):
+        return any(entry["name"] == name for entry in self.index())
+
+def iter_mplus_by_score():
+    """(name, data) by M+ score from the JSON Lines file, or the legacy JSON if that is all there is"""
+    reader = MplusReader()
+    if reader.exists():
+        return reader.by_score()
+    if os.path.exists(MPLUS_LEGACY_FILE):
+        with open(MPLUS_LEGACY_FILE, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        return iter(sorted(legacy.items(), key=lambda item: _score(item[1]), reverse=True))
+    return iter([])
+
+# ────────────────────────────────────────────────
+# Season-long Run Store
+def parse_run_id(url):
+    """(run_id, season) from a Raider.IO run URL, e.g. ("season-tww-3/12345", "season-tww-3")"""
+    match = RUN_URL_PATTERN.search(url or "")
+    if not match:
+        return (url or None), None
+    return f"{match.group(1)}/{match.group(2)}", match.group(1)
+
+class MplusRunStore:
+    """Persistent, deduplicated store of every M+ run seen for the roster.
+
+    Raider.IO only returns a character's latest runs, so older ones fall out
+    of the API window; each fetch is merged in here instead. Runs are keyed by
+    the id in their Raider.IO URL (a group run shared by several guild members
+    is stored once) and each character has a high-water mark, so only runs
+    completed after it are inserted.
+    """
+
+    def __init__(self, path=MPLUS_RUNS_DB_FILE):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    season TEXT,
+                    url TEXT,
+                    dungeon TEXT,
+                    short_name TEXT,
+                    level INTEGER,
+                    num_chests INTEGER,
+                    timed INTEGER,
+                    clear_time_ms INTEGER,
+                    par_time_ms INTEGER,
+                    completed_at TEXT,
+                    affixes TEXT,
+                    roster TEXT
+                );
+                CREATE TABLE IF NOT EXISTS run_characters (
+                    run_id TEXT NOT NULL,
+                    character TEXT NOT NULL,
+                    score REAL,
+                    PRIMARY KEY (run_id, character)
+                );
+                CREATE TABLE IF NOT EXISTS high_water (
+                    character TEXT PRIMARY KEY,
+                    completed_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_runs_dungeon_level ON runs (dungeon, level);
+                CREATE INDEX IF NOT EXISTS idx_runs_level ON runs (level);
+                CREATE INDEX IF NOT EXISTS idx_run_characters_character ON run_characters (character);
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def high_water_mark(self, character):
+        """completed_at of the newest stored run for a character (None if none)"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT completed_at FROM high_water WHERE character = ?", (character,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, character, runs):
+        """Insert runs newer than the character's high-water mark; returns how many were new"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT completed_at FROM high_water WHERE character = ?", (character,)).fetchone()
+            mark = row[0] if row else ""
+            new_runs = [run for run in runs if run.get("completed_at", "") > mark]
+
+            for run in new_runs:
+                run_id, season = parse_run_id(run.get("url"))
+                if run_id is None:
+                    run_id = f"{character}/{run.get('completed_at', '')}/{run.get('short_name', '')}"
+                conn.execute(
+                    "INSERT OR IGNORE INTO runs (run_id, season, url, dungeon, short_name, level, num_chests, timed,"
+                    " clear_time_ms, par_time_ms, completed_at, affixes, roster) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, season, run.get("url", ""), run.get("dungeon", "Unknown"), run.get("short_name", "Unknown"),
+                     run.get("level", 0), run.get("num_chests", 0), int(bool(run.get("timed", False))),
+                     run.get("clear_time_ms", 0), run.get("par_time_ms", 0), run.get("completed_at", ""),
+                     json.dumps(run.get("affixes", []), ensure_ascii=False),
+                     json.dumps(run.get("roster", []), ensure_ascii=False))
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO run_characters (run_id, character, score) VALUES (?, ?, ?)",
+                    (run_id, character, run.get("score", 0))
+                )
+
+            if new_runs:
+                newest = max(run.get("completed_at", "") for run in new_runs)
+                conn.execute("INSERT OR REPLACE INTO high_water (character, completed_at) VALUES (?, ?)", (character, newest))
+            conn.commit()
+            return len(new_runs)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            cur = self._connect().execute(sql, params)
+            columns = [column[0] for column in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def character_runs(self, character, dungeon=None, min_level=0):
+        """A character's stored runs, newest first"""
+        sql = ("SELECT r.*, c.score FROM runs r JOIN run_characters c ON c.run_id = r.run_id"
+               " WHERE c.character = ? AND r.level >= ?")
+        params = [character, min_level]
+        if dungeon:
+            sql += " AND r.dungeon = ?"
+            params.append(dungeon)
+        return self._query(sql + " ORDER BY r.completed_at DESC", params)
+
+    def dungeon_runs(self, dungeon, min_level=0):
+        """Stored runs of one dungeon at or above a key level, highest key first"""
+        return self._query(
+            "SELECT * FROM runs WHERE dungeon = ? AND level >= ? ORDER BY level DESC, completed_at DESC",
+            (dungeon, min_level)
+        )
+
+    def current_season(self):
+        """Season of the most recently completed stored run"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT season FROM runs WHERE season IS NOT NULL ORDER BY completed_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def season_summary(self, season=None):
+        """{character: {'runs', 'timed', 'highest_timed'}} for a season (default: current)"""
+        season = season or self.current_season()
+        rows = self._query(
+            "SELECT c.character AS character, COUNT(*) AS runs, SUM(r.timed) AS timed,"
+            " MAX(CASE WHEN r.timed THEN r.level END) AS highest_timed"
+            " FROM run_characters c JOIN runs r ON r.run_id = c.run_id"
+            " WHERE r.season IS ? GROUP BY c.character",
+            (season,)
+        )
+        return {row.pop("character"): row for row in rows}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+mplus_run_store = MplusRunStore()
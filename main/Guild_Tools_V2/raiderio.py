@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import threading
+
+from http_client import http_client
+
+# ────────────────────────────────────────────────
+# Settings
+REGION = os.getenv("REGION", "kr")
+RAIDERIO_PROFILE_URL = "https://raider.io/api/v1/characters/profile"
+
+# Union of the fields the crawler (score) and mplus_enhanced (recent runs, gear) need
+RAIDERIO_FIELDS = "mythic_plus_scores_by_season:current,mythic_plus_recent_runs,gear"
+
+RAIDERIO_RUN_CACHE_FILE = os.path.join("logs", "raiderio_run.json")
+RAIDERIO_RUN_MAX_AGE_HOURS = float(os.getenv("RAIDERIO_RUN_MAX_AGE_HOURS", "6"))  # Older payloads are re-fetched
+
+# ────────────────────────────────────────────────
+# Run-scoped Profile Cache
+class RaiderIOProfiles:
+    """Raw Raider.IO profile payloads shared by every stage of one run.
+
+    The crawler fetches each profile once with RAIDERIO_FIELDS and saves the
+    payloads to logs/raiderio_run.json; mplus_enhanced then reads them instead
+    of asking Raider.IO again. The crawler resets the file when a new run
+    starts, and entries older than RAIDERIO_RUN_MAX_AGE_HOURS are ignored.
+    """
+
+    def __init__(self, path=RAIDERIO_RUN_CACHE_FILE, max_age_hours=RAIDERIO_RUN_MAX_AGE_HOURS):
+        self.path = path
+        self.max_age = max_age_hours * 60 * 60
+        self.entries = None
+        self.fetched = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _load(self):
+        if self.entries is None:
+            self.entries = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self.entries = json.load(f)
+                except (OSError, ValueError):
+                    self.entries = {}
+        return self.entries
+
+    def _key(self, server, character):
+        return f"{REGION}/{server.lower()}/{character}"
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_profile(self, server, character, request=None):
+        """Profile payload for a character, fetched at most once per run (None on failure).
+
+        request(url, params) must return a response or None; by default the
+        pooled http_client is used.
+        """
+        key = self._key(server, character)
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._load().get(key)
+                fresh = entry and time.time() - entry["fetched_at"] < self.max_age
+                if fresh:
+                    self.reused += 1
+            if fresh:
+                return entry["data"]
+
+            params = {
+                "region": REGION,
+                "realm": server,
+                "name": character,
+                "fields": RAIDERIO_FIELDS
+            }
+            if request is None:
+                resp = http_client.get(RAIDERIO_PROFILE_URL, params=params, timeout=15)
+            else:
+                resp = request(RAIDERIO_PROFILE_URL, params)
+            if resp is None or resp.status_code != 200:
+                return None
+
+            data = resp.json()
+            with self._lock:
+                self._load()[key] = {"fetched_at": time.time(), "data": data}
+                self.fetched += 1
+            return data
+
+    def reset(self):
+        """Start a new run: forget every cached payload"""
+        with self._lock:
+            self.entries = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def save(self):
+        """Persist payloads for later stages of this run (atomic write)"""
+        with self._lock:
+            entries = dict(self._load())
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+raiderio_profiles = RaiderIOProfiles()
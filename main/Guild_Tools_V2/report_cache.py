@@ -0,0 +1,270 @@
+import os
+import time
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# ────────────────────────────────────────────────
+# Settings
+REPORT_CACHE_FILE = os.path.join("logs", "report_cache.pkl")
+REPORT_CACHE_VERSION = 1  # Bump when the parsers below change
+
+REPORT_PARSE_WORKERS = int(os.getenv("REPORT_PARSE_WORKERS", str(os.cpu_count() or 1)))
+REPORT_PARALLEL_THRESHOLD = int(os.getenv("REPORT_PARALLEL_THRESHOLD", "64"))  # Fewer misses are parsed serially
+
+# ────────────────────────────────────────────────
+# Markdown Parsing (detailed/*.md)
+def parse_wcl_from_markdown(content):
+    """Extract WCL data from markdown content for both difficulties"""
+    wcl_data = {
+        'has_logs': False,
+        'mythic': {
+            'best_performance': 'N/A',
+            'boss_rankings': []
+        },
+        'heroic': {
+            'best_performance': 'N/A',
+            'boss_rankings': []
+        },
+        'all_stars': []
+    }
+
+    lines = content.split('\n')
+    current_difficulty = None
+    in_boss_table = False
+    in_allstars_table = False
+
+    for i, line in enumerate(lines):
+        # Check for Mythic section
+        if '## 🏆 WarcraftLogs Performance - Mythic' in line:
+            current_difficulty = 'mythic'
+            wcl_data['has_logs'] = True
+            continue
+
+        # Check for Heroic section
+        if '## 🏆 WarcraftLogs Performance - Heroic' in line:
+            current_difficulty = 'heroic'
+            wcl_data['has_logs'] = True
+            continue
+
+        # Check for All Stars (goes in main section)
+        if '## ⭐ All Stars Points' in line:
+            current_difficulty = None
+            in_allstars_table = True
+            in_boss_table = False
+            continue
+
+        if current_difficulty:
+            if 'Best Performance Average:' in line:
+                try:
+                    wcl_data[current_difficulty]['best_performance'] = line.split('**')[1].strip()
+                except:
+                    pass
+
+            if '### 📋 Boss Rankings' in line:
+                in_boss_table = True
+                continue
+
+            if in_boss_table and line.startswith('|') and '---' not in line:
+                parts = [p.strip() for p in line.split('|')[1:-1]]
+                if len(parts) >= 4 and parts[0] not in ['Boss', '']:
+                    try:
+                        wcl_data[current_difficulty]['boss_rankings'].append({
+                            'boss': parts[0],
+                            'rank_percent': parts[1].replace('%', '').strip(),
+                            'best_amount': int(parts[2].replace(',', '')),
+                            'total_kills': int(parts[3])
+                        })
+                    except:
+                        pass
+
+            # Stop boss table when we hit another section
+            if line.startswith('---') or line.startswith('##'):
+                in_boss_table = False
+
+        if in_allstars_table and line.startswith('|') and '---' not in line:
+            parts = [p.strip() for p in line.split('|')[1:-1]]
+            if len(parts) >= 5 and parts[0] not in ['Partition', '']:
+                try:
+                    wcl_data['all_stars'].append({
+                        'partition': parts[0],
+                        'spec': parts[1],
+                        'points': float(parts[2].replace(',', '')),
+                        'possible': float(parts[3].replace(',', '')),
+                        'rank_percent': float(parts[4].replace('%', '').strip())
+                    })
+                except:
+                    pass
+
+    return wcl_data
+
+def extract_spec_icon(content):
+    """SPEC_ICON url from a report ('' if missing)"""
+    for line in content.split('\n'):
+        if line.startswith('**SPEC_ICON:'):
+            return line.replace('**SPEC_ICON:', '').replace('**', '').strip()
+    return ''
+
+def parse_role_from_markdown(content):
+    """Role from the report header line ('**Spec Class** | **Role** | **Server**')"""
+    for line in content.split('\n'):
+        parts = [p.strip().strip('*') for p in line.split('|')]
+        if line.startswith('**') and len(parts) == 3:
+            return parts[1] or 'Unknown'
+    return 'Unknown'
+
+def parse_report(path):
+    """Read and parse one report: content, spec icon, role and WCL summary"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return {
+        'content': content,
+        'spec_icon': extract_spec_icon(content),
+        'role': parse_role_from_markdown(content),
+        'wcl': parse_wcl_from_markdown(content)
+    }
+
+def parse_report_chunk(paths):
+    """Parse a chunk of reports in a worker process (results in input order)"""
+    return [parse_report(path) for path in paths]
+
+def parse_reports(paths, workers=None, threshold=None):
+    """Parse many reports; returns (reports in input order, mode description).
+
+    Small inputs are parsed serially; larger ones are split into chunks
+    across a process pool. Results are merged in input order, so the output
+    is the same either way. Falls back to serial if the pool cannot start.
+    """
+    workers = REPORT_PARSE_WORKERS if workers is None else workers
+    threshold = REPORT_PARALLEL_THRESHOLD if threshold is None else threshold
+    if workers <= 1 or len(paths) < threshold:
+        return [parse_report(path) for path in paths], "serial"
+
+    workers = min(workers, len(paths))
+    chunk_size = max(1, -(-len(paths) // (workers * 4)))  # ~4 chunks per worker
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [report for chunk in executor.map(parse_report_chunk, chunks) for report in chunk]
+    except (OSError, RuntimeError, BrokenProcessPool, pickle.PicklingError) as e:
+        print(f"⚠️ Process pool unavailable ({e}), parsing serially")
+        return [parse_report(path) for path in paths], "serial"
+    return results, f"{workers} processes, {len(chunks)} chunks"
+
+# ────────────────────────────────────────────────
+# Parsed Report Cache
+class ReportCache:
+    """Parsed detailed/*.md reports, shared by both dashboard generators.
+
+    Entries are keyed by absolute path and only reused while the file's
+    (mtime, size) is unchanged, so an unchanged report is never re-read or
+    re-parsed. The cache is pickled to logs/report_cache.pkl between builds
+    and kept in memory within a process.
+    """
+
+    def __init__(self, path=REPORT_CACHE_FILE):
+        self.path = path
+        self.entries = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is None:
+            self.entries = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, 'rb') as f:
+                        data = pickle.load(f)
+                    if data.get('version') == REPORT_CACHE_VERSION:
+                        self.entries = data['entries']
+                except (OSError, EOFError, pickle.UnpicklingError, AttributeError, KeyError, TypeError):
+                    self.entries = {}
+        return self.entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': REPORT_CACHE_VERSION, 'entries': self.entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def load_reports(self, detailed_dir="detailed", workers=None):
+        """{name: parsed report} for every .md file in detailed_dir
+
+        Cache misses are parsed together (in parallel for large batches, see
+        parse_reports); workers overrides REPORT_PARSE_WORKERS.
+        """
+        if not os.path.exists(detailed_dir):
+            return {}
+
+        with self._lock:
+            entries = self._load()
+            directory = os.path.abspath(detailed_dir)
+            files = []  # (name, path) in sorted order
+            cached = {}  # path -> report still valid
+            missing = []  # (path, signature) to parse
+            for fname in sorted(os.listdir(detailed_dir)):
+                if not fname.endswith('.md'):
+                    continue
+                path = os.path.join(directory, fname)
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                files.append((fname[:-3], path))
+
+                entry = entries.get(path)
+                if entry and entry['signature'] == signature:
+                    self.hits += 1
+                    cached[path] = entry['report']
+                else:
+                    self.misses += 1
+                    missing.append((path, signature))
+
+        # Parse outside the lock so other callers are not blocked on the pool
+        if missing:
+            started = time.perf_counter()
+            parsed, mode = parse_reports([path for path, _ in missing], workers)
+            print(f"   - Parsed {len(missing)} reports in {time.perf_counter() - started:.2f}s ({mode})")
+
+        with self._lock:
+            entries = self._load()
+            changed = bool(missing)
+            if missing:
+                for (path, signature), report in zip(missing, parsed):
+                    entries[path] = {'signature': signature, 'report': report}
+                    cached[path] = report
+
+            reports = {name: cached[path] for name, path in files}
+            seen = {path for _, path in files}
+
+            # Forget reports that were deleted from this directory
+            for path in [p for p in entries if os.path.dirname(p) == directory and p not in seen]:
+                del entries[path]
+                changed = True
+
+            if changed:
+                self._save()
+            return reports
+
+    def clear(self):
+        """Drop every cached report"""
+        with self._lock:
+            self.entries = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+report_cache = ReportCache()
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        report_cache.clear()
+        print("🗑️ Report cache cleared")
+    else:
+        detailed_dir = sys.argv[1] if len(sys.argv) > 1 else "detailed"
+        started = time.perf_counter()
+        reports = report_cache.load_reports(detailed_dir)
+        print(f"📄 {len(reports)} reports ({report_cache.hits} cached, {report_cache.misses} parsed) in {time.perf_counter() - started:.2f}s")
+        print("💡 Usage: python report_cache.py [detailed_dir] | clear")
@@ -2,86 +2,8 @@ import csv
 import os
 import json
 from datetime import datetime
-
-def parse_wcl_from_markdown(content):
-    """Extract WCL data from markdown content for both difficulties with rankings"""
-    wcl_data = {
-        'has_logs': False,
-        'mythic': {
-            'best_performance': 'N/A',
-            'boss_rankings': []
-        },
-        'heroic': {
-            'best_performance': 'N/A',
-            'boss_rankings': []
-        },
-        'all_stars': []
-    }
-    
-    lines = content.split('\n')
-    current_difficulty = None
-    in_boss_table = False
-    in_allstars_table = False
-    
-    for i, line in enumerate(lines):
-        if '## 🏆 WarcraftLogs Performance - Mythic' in line:
-            current_difficulty = 'mythic'
-            wcl_data['has_logs'] = True
-            continue
-        
-        if '## 🏆 WarcraftLogs Performance - Heroic' in line:
-            current_difficulty = 'heroic'
-            wcl_data['has_logs'] = True
-            continue
-        
-        if '## ⭐ All Stars Points' in line:
-            current_difficulty = None
-            in_allstars_table = True
-            in_boss_table = False
-            continue
-        
-        if current_difficulty:
-            if 'Best Performance Average:' in line:
-                try:
-                    wcl_data[current_difficulty]['best_performance'] = line.split('**')[1].strip()
-                except:
-                    pass
-            
-            if '### 📋 Boss Rankings' in line:
-                in_boss_table = True
-                continue
-            
-            if in_boss_table and line.startswith('|') and '---' not in line:
-                parts = [p.strip() for p in line.split('|')[1:-1]]
-                if len(parts) >= 4 and parts[0] not in ['Boss', '']:
-                    try:
-                        wcl_data[current_difficulty]['boss_rankings'].append({
-                            'boss': parts[0],
-                            'rank_percent': parts[1].replace('%', '').strip(),
-                            'best_amount': int(parts[2].replace(',', '')),
-                            'total_kills': int(parts[3])
-                        })
-                    except:
-                        pass
-            
-            if line.startswith('---') or line.startswith('##'):
-                in_boss_table = False
-        
-        if in_allstars_table and line.startswith('|') and '---' not in line:
-            parts = [p.strip() for p in line.split('|')[1:-1]]
-            if len(parts) >= 5 and parts[0] not in ['Partition', '']:
-                try:
-                    wcl_data['all_stars'].append({
-                        'partition': parts[0],
-                        'spec': parts[1],
-                        'points': float(parts[2].replace(',', '')),
-                        'possible': float(parts[3].replace(',', '')),
-                        'rank_percent': float(parts[4].replace('%', '').strip())
-                    })
-                except:
-                    pass
-    
-    return wcl_data
+from crawl_results import load_crawl_results
+from report_cache import report_cache
 
 def get_wcl_color(score):
     """Get WarcraftLogs color based on percentile"""
@@ -97,49 +19,125 @@ def get_wcl_color(score):
     except:
         return '#808080'
 
-def calculate_overall_rank(character_name, all_characters_wcl):
-    """Calculate overall rank based on average performance"""
-    scores = []
-    for char_name, wcl_data in all_characters_wcl.items():
-        if not wcl_data.get('has_logs'):
-            continue
-        
-        mythic_perf = wcl_data.get('mythic', {}).get('best_performance', 'N/A')
-        try:
-            if mythic_perf != 'N/A':
-                scores.append((char_name, float(str(mythic_perf).replace(',', ''))))
-        except:
-            pass
-    
-    # Sort by score descending
-    scores.sort(key=lambda x: x[1], reverse=True)
-    
-    # Find character's rank
-    for rank, (name, score) in enumerate(scores, 1):
-        if name == character_name:
-            return rank, len(scores), score
-    
-    return None, len(scores), 0
+# ────────────────────────────────────────────────
+# Ranking Engine
+RANKING_DIFFICULTIES = ('mythic', 'heroic')
+
+def _performance(value):
+    """Best performance average as a float (None for N/A)"""
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+def competition_ranks(scored):
+    """{name: rank entry} for [(name, score)] already sorted best first.
+
+    Equal scores share a rank and the next rank skips (1, 2, 2, 4). Percentile
+    is the share of the others ranked below: 100 for the top, 0 for the last.
+    """
+    table = {}
+    total = len(scored)
+    rank = 0
+    previous = None
+    for position, (name, score) in enumerate(scored, 1):
+        if score != previous:
+            rank = position
+            previous = score
+        table[name] = {
+            'rank': rank,
+            'total': total,
+            'percentile': 100.0 if total == 1 else (total - rank) / (total - 1) * 100,
+            'score': score
+        }
+    return table
+
+class RankingEngine:
+    """Guild rank tables built once from every character's WCL summary.
+
+    Each partition (difficulty, difficulty + role, difficulty + boss) is sorted
+    once; lookups are dict reads, so rendering n characters stays O(n log n).
+    """
+
+    def __init__(self, all_wcl_data, roles=None):
+        roles = roles or {}
+        self.overall = {}  # difficulty -> {name: rank entry}
+        self.by_role = {}  # difficulty -> {role: {name: rank entry}}
+        self.bosses = {}   # difficulty -> {boss: {name: rank entry}}
+
+        for difficulty in RANKING_DIFFICULTIES:
+            scored = []
+            boss_scores = {}
+            for name, wcl_data in all_wcl_data.items():
+                if not wcl_data.get('has_logs'):
+                    continue
+                difficulty_data = wcl_data.get(difficulty, {})
+                score = _performance(difficulty_data.get('best_performance', 'N/A'))
+                if score is not None:
+                    scored.append((name, score))
+                for boss in difficulty_data.get('boss_rankings', []):
+                    boss_score = _performance(boss.get('rank_percent'))
+                    if boss_score is not None:
+                        boss_scores.setdefault(boss.get('boss', 'Unknown'), []).append((name, boss_score))
+
+            scored.sort(key=lambda item: item[1], reverse=True)
+            self.overall[difficulty] = competition_ranks(scored)
+
+            # Role partitions keep the overall order, so no re-sort is needed
+            role_scores = {}
+            for name, score in scored:
+                role_scores.setdefault(roles.get(name, 'Unknown'), []).append((name, score))
+            self.by_role[difficulty] = {role: competition_ranks(items) for role, items in role_scores.items()}
+
+            self.bosses[difficulty] = {
+                boss: competition_ranks(sorted(items, key=lambda item: item[1], reverse=True))
+                for boss, items in boss_scores.items()
+            }
+
+    def rank(self, name, difficulty='mythic', role=None):
+        """Rank entry (rank, total, percentile, score) in the guild or in a role; None if unranked"""
+        if role is None:
+            return self.overall.get(difficulty, {}).get(name)
+        return self.by_role.get(difficulty, {}).get(role, {}).get(name)
+
+    def boss_rank(self, name, difficulty, boss):
+        """Rank entry for one boss of a difficulty; None if no parse"""
+        return self.bosses.get(difficulty, {}).get(boss, {}).get(name)
+
+def format_rank(entry):
+    """'#2 / 7' for a rank entry ('-' if unranked)"""
+    if not entry:
+        return '-'
+    return f"#{entry['rank']} / {entry['total']}"
+
+def format_rank_note(entry):
+    """Guild rank note for a difficulty heading ('' if unranked)"""
+    if not entry:
+        return ''
+    return f' <span style="margin-left:auto;font-size:.8em;color:#666;font-weight:normal">Guild {format_rank(entry)} · percentile {entry["percentile"]:.0f}</span>'
 
 def generate_rankings_html(characters, character_details, character_specs, detailed_dir="detailed"):
     """Generate Rankings tab HTML content"""
     
-    # Parse all WCL data
+    # Parse all WCL data (structured crawl results first, markdown as fallback)
+    crawl_records = load_crawl_results()
     all_wcl_data = {}
-    for fname in os.listdir(detailed_dir):
-        if fname.endswith('.md'):
-            name = fname[:-3]
-            with open(os.path.join(detailed_dir, fname), 'r', encoding='utf-8') as f:
-                content = f.read()
-                all_wcl_data[name] = parse_wcl_from_markdown(content)
+    roles = {}
+    for name, report in report_cache.load_reports(detailed_dir).items():
+        record = crawl_records.get(name) or report
+        all_wcl_data[name] = record['wcl']
+        roles[name] = record.get('role', 'Unknown')
+    
+    # Rank tables for every difficulty / role / boss, sorted once
+    engine = RankingEngine(all_wcl_data, roles)
     
     # Filter characters with raid logs
     characters_with_logs = [(c, all_wcl_data.get(c['ID'])) 
                             for c in characters 
                             if c['ID'] in all_wcl_data and all_wcl_data[c['ID']].get('has_logs')]
     
-    # Sort by mythic performance
-    characters_with_logs.sort(key=lambda x: float(str(x[1].get('mythic', {}).get('best_performance', '0')).replace(',', '')), reverse=True)
+    # Sort by mythic performance (characters without a mythic average last)
+    characters_with_logs.sort(key=lambda x: (engine.rank(x[0]['ID']) or {}).get('score', 0), reverse=True)
     
     html = """
 <div id="rankings" class="tab-content">
@@ -173,8 +171,10 @@ def generate_rankings_html(characters, character_details, character_specs, detai
             heroic_perf = heroic_data.get('best_performance', 'N/A')
             heroic_bosses = heroic_data.get('boss_rankings', [])
             
-            # Calculate overall rank
-            overall_rank, total_chars, avg_score = calculate_overall_rank(name, all_wcl_data)
+            # Guild and role ranks
+            role = roles.get(name, 'Unknown')
+            overall = engine.rank(name, 'mythic')
+            role_rank = engine.rank(name, 'mythic', role)
             
             # All Stars
             all_stars = wcl_data.get('all_stars', [])
@@ -200,8 +200,10 @@ def generate_rankings_html(characters, character_details, character_specs, detai
 <div style="display:flex;gap:15px;margin-top:10px;flex-wrap:wrap">
 '''
             
-            if overall_rank:
-                html += f'<span class="badge" style="background:#667eea;color:#fff">Guild Rank: #{overall_rank} / {total_chars}</span>'
+            if overall:
+                html += f'<span class="badge" style="background:#667eea;color:#fff" title="Guild percentile: {overall["percentile"]:.0f}">Guild Rank: #{overall["rank"]} / {overall["total"]}</span>'
+            if role_rank and role != 'Unknown':
+                html += f'<span class="badge" style="background:#764ba2;color:#fff" title="{role} percentile: {role_rank["percentile"]:.0f}">{role} Rank: #{role_rank["rank"]} / {role_rank["total"]}</span>'
             
             html += f'''
 <span class="badge" style="background:{mythic_color};color:#fff">Mythic Avg: {mythic_perf}</span>
@@ -259,7 +261,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
             html += f'''
 <div class="ranking-difficulty-mythic">
 <h4 style="margin:25px 0 15px 0;color:#a335ee;display:flex;align-items:center;gap:10px">
-<span style="font-size:1.3em">⚔️</span> Mythic Boss Rankings
+<span style="font-size:1.3em">⚔️</span> Mythic Boss Rankings{format_rank_note(engine.rank(name, 'mythic'))}
 </h4>
 '''
             
@@ -273,6 +275,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
 <th style="padding:15px;text-align:center;color:#fff">Rank %</th>
 <th style="padding:15px;text-align:right;color:#fff">Best DPS/HPS</th>
 <th style="padding:15px;text-align:center;color:#fff">Kills</th>
+<th style="padding:15px;text-align:center;color:#fff">Guild</th>
 <th style="padding:15px;text-align:left;color:#fff">Performance</th>
 </tr>
 </thead>
@@ -281,6 +284,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
                 
                 for boss in mythic_bosses:
                     boss_name = boss.get('boss', 'Unknown')
+                    boss_guild = format_rank(engine.boss_rank(name, 'mythic', boss_name))
                     rank_pct = boss.get('rank_percent', 0)
                     best_amount = boss.get('best_amount', 0)
                     kills = boss.get('total_kills', 0)
@@ -306,6 +310,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
 {kills}
 </span>
 </td>
+<td style="padding:15px;text-align:center;color:#666;font-weight:600">{boss_guild}</td>
 <td style="padding:15px">
 <div class="perf-bar" style="background:#e0e0e0;height:25px;border-radius:6px;overflow:hidden;min-width:150px">
 <div style="height:100%;background:{boss_color};width:{rank_val}%;display:flex;align-items:center;padding-left:10px;color:#fff;font-weight:600;font-size:0.85em">
@@ -326,7 +331,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
             html += f'''
 <div class="ranking-difficulty-heroic" style="display:none">
 <h4 style="margin:25px 0 15px 0;color:#0070dd;display:flex;align-items:center;gap:10px">
-<span style="font-size:1.3em">🛡️</span> Heroic Boss Rankings
+<span style="font-size:1.3em">🛡️</span> Heroic Boss Rankings{format_rank_note(engine.rank(name, 'heroic'))}
 </h4>
 '''
             
@@ -340,6 +345,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
 <th style="padding:15px;text-align:center;color:#fff">Rank %</th>
 <th style="padding:15px;text-align:right;color:#fff">Best DPS/HPS</th>
 <th style="padding:15px;text-align:center;color:#fff">Kills</th>
+<th style="padding:15px;text-align:center;color:#fff">Guild</th>
 <th style="padding:15px;text-align:left;color:#fff">Performance</th>
 </tr>
 </thead>
@@ -348,6 +354,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
                 
                 for boss in heroic_bosses:
                     boss_name = boss.get('boss', 'Unknown')
+                    boss_guild = format_rank(engine.boss_rank(name, 'heroic', boss_name))
                     rank_pct = boss.get('rank_percent', 0)
                     best_amount = boss.get('best_amount', 0)
                     kills = boss.get('total_kills', 0)
@@ -373,6 +380,7 @@ def generate_rankings_html(characters, character_details, character_specs, detai
 {kills}
 </span>
 </td>
+<td style="padding:15px;text-align:center;color:#666;font-weight:600">{boss_guild}</td>
 <td style="padding:15px">
 <div class="perf-bar" style="background:#e0e0e0;height:25px;border-radius:6px;overflow:hidden;min-width:150px">
 <div style="height:100%;background:{boss_color};width:{rank_val}%;display:flex;align-items:center;padding-left:10px;color:#fff;font-weight:600;font-size:0.85em">
@@ -409,20 +417,9 @@ def generate_html_dashboard_with_rankings(csv_file, output_file="dashboard.html"
         characters = list(csv.DictReader(f))
     
     # Load character details and specs
-    character_details = {}
-    character_specs = {}
-    if os.path.exists(detailed_dir):
-        for fname in os.listdir(detailed_dir):
-            if fname.endswith('.md'):
-                name = fname[:-3]
-                with open(os.path.join(detailed_dir, fname), 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    character_details[name] = content
-                    
-                    for line in content.split('\n'):
-                        if line.startswith('**SPEC_ICON:'):
-                            character_specs[name] = line.replace('**SPEC_ICON:', '').replace('**', '').strip()
-                            break
+    reports = report_cache.load_reports(detailed_dir)
+    character_details = {name: report['content'] for name, report in reports.items()}
+    character_specs = {name: report['spec_icon'] for name, report in reports.items() if report['spec_icon']}
     
     # Generate Rankings HTML
     rankings_html = generate_rankings_html(characters, character_details, character_specs, detailed_dir)
@@ -1,9 +1,15 @@
+import argparse
 import csv
+import json
 import os
+import sys
 import time
+import heapq
+import random
+import threading
 import requests
 from urllib.parse import quote
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn
 from rich.table import Table
@@ -14,6 +20,11 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+from http_client import http_client, parse_retry_after
+from media_cache import media_cache
+from crawl_results import CRAWL_RESULTS_FILE, build_record, write_crawl_results, load_crawl_results
+from raiderio import raiderio_profiles
+
 # ────────────────────────────────────────────────
 # Settings
 INPUT_FILE = "characters.csv"
@@ -23,6 +34,9 @@ OUTPUT_FILE = os.path.join(OUTPUT_DIR, "Player_data.csv")
 FAILED_LOG = os.path.join(OUTPUT_DIR, "failed_characters.log")
 PREVIOUS_FILE = os.path.join(OUTPUT_DIR, "previous_Player_data.csv")
 WEEKLY_FILE = os.path.join(OUTPUT_DIR, "weekly_comparison.csv")
+CRAWL_STATE_FILE = os.path.join(OUTPUT_DIR, "crawl_state.json")
+CRAWL_JOURNAL_FILE = os.path.join(OUTPUT_DIR, "crawl_journal.jsonl")
+INCREMENTAL_MAX_AGE_HOURS = float(os.getenv("INCREMENTAL_MAX_AGE_HOURS", "168"))  # Force a full refresh after this
 
 # API Credentials - Loaded from .env file
 BLIZZARD_CLIENT_ID = os.getenv("BLIZZARD_CLIENT_ID")
@@ -36,6 +50,15 @@ BLIZZARD_TOKEN_URL = "https://kr.battle.net/oauth/token"
 REGION = os.getenv("REGION", "kr")
 NAMESPACE = os.getenv("NAMESPACE", "profile-kr")
 
+WCL_API_URL = "https://www.warcraftlogs.com/api/v2/client"
+WCL_BATCH_SIZE = int(os.getenv("WCL_BATCH_SIZE", "10"))  # Characters per GraphQL request
+WCL_POINTS_PER_CHARACTER = float(os.getenv("WCL_POINTS_PER_CHARACTER", "2"))  # Estimated point cost
+
+# Crawl retries: each character is split into these parts, and only failed parts are retried
+CRAWL_PARTS = ("equipment", "spec", "rio", "wcl")
+MAX_CRAWL_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2  # seconds, doubled per attempt with jitter
+
 # Console Theme
 theme = Theme({
     "info": "cyan",
@@ -117,20 +140,24 @@ class TokenManager:
     def __init__(self):
         self.token = None
         self.expiry = 0
+        self._lock = threading.Lock()
     
     def get_token(self):
         """Get valid Blizzard API token with automatic refresh"""
-        if not self.token or time.time() > self.expiry:
-            console.print("[warning]🔄 Refreshing Blizzard token...[/warning]")
-            self.token = self._fetch_token()
-            self.expiry = time.time() + (60 * 50)  # 50 minutes
+        if self.token and time.time() <= self.expiry:
+            return self.token
+        with self._lock:  # Only one thread refreshes; the rest reuse its token
+            if not self.token or time.time() > self.expiry:
+                console.print("[warning]🔄 Refreshing Blizzard token...[/warning]")
+                self.token = self._fetch_token()
+                self.expiry = time.time() + (60 * 50)  # 50 minutes
         return self.token
     
     def _fetch_token(self):
         """Fetch new token from Blizzard OAuth"""
         data = {"grant_type": "client_credentials"}
         try:
-            r = requests.post(
+            r = http_client.post(
                 BLIZZARD_TOKEN_URL,
                 data=data,
                 auth=(BLIZZARD_CLIENT_ID, BLIZZARD_CLIENT_SECRET),
@@ -149,13 +176,13 @@ token_manager = TokenManager()
 # ────────────────────────────────────────────────
 # Utility Functions
 def safe_request(method, url, retries=3, backoff=2, **kwargs):
-    """Robust API request with retry logic"""
+    """Robust API request with retry logic (over pooled keep-alive connections)"""
     for attempt in range(1, retries + 1):
         try:
             if 'timeout' not in kwargs:
                 kwargs['timeout'] = 15
             
-            resp = requests.request(method, url, **kwargs)
+            resp = http_client.request(method, url, **kwargs)
             
             if resp.status_code == 404:
                 return None
@@ -167,13 +194,13 @@ def safe_request(method, url, retries=3, backoff=2, **kwargs):
                 continue
             
             if resp.status_code == 429:
-                retry_after = int(resp.headers.get("Retry-After", backoff ** attempt))
-                console.print(f"[warning]⏳ Rate limited. Waiting {retry_after}s...[/warning]")
-                time.sleep(retry_after)
-                continue
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"), backoff ** attempt)
+                console.print(f"[warning]⏳ Rate limited. Waiting {retry_after:.0f}s...[/warning]")
+                if http_client.get_limiter(url) is None:
+                    time.sleep(retry_after)
+                continue  # Host limiter is paused and slowed; next acquire waits
             
             resp.raise_for_status()
-            time.sleep(0.1)  # Rate limit protection
             return resp
             
         except requests.exceptions.Timeout:
@@ -214,12 +241,16 @@ def process_character_name(name):
 # ────────────────────────────────────────────────
 # API Functions
 
-def get_spec_icon(spec_id, token):
-    """Get specialization icon URL from Blizzard media API"""
-    if not spec_id or not token:
+def get_media_icon(kind, media_path, media_id, token):
+    """Get icon URL from Blizzard media API, served from the persistent media cache when possible"""
+    if not media_id or not token:
         return ""
     
-    url = f"https://{REGION}.api.blizzard.com/data/wow/media/playable-specialization/{spec_id}"
+    cached = media_cache.get(kind, media_id)
+    if cached is not None:
+        return cached
+    
+    url = f"https://{REGION}.api.blizzard.com/data/wow/media/{media_path}/{media_id}"
     headers = {"Authorization": f"Bearer {token}"}
     params = {"namespace": "static-kr", "locale": "ko_KR"}
     
@@ -230,31 +261,122 @@ def get_spec_icon(spec_id, token):
     try:
         data = resp.json()
         assets = data.get("assets", [])
+        icon_url = ""
         for asset in assets:
             if asset.get("key") == "icon":
-                return asset.get("value", "")
+                icon_url = asset.get("value", "")
+                break
+        media_cache.set(kind, media_id, icon_url)
+        return icon_url
     except:
         pass
     
     return ""
 
-def get_character_spec(server, character):
+def get_spec_icon(spec_id, token):
+    """Get specialization icon URL from Blizzard media API"""
+    return get_media_icon("spec", "playable-specialization", spec_id, token)
+
+class CharacterFetchContext:
+    """Request-scoped memo of Blizzard profile payloads for one character crawl.
+
+    Each profile endpoint (summary, equipment, specializations, ...) is fetched
+    at most once per crawl; equipment rows, average ilvl and spec are all
+    derived from the same parsed payloads. Failed fetches are not memoized,
+    so a retry within the same context hits the API again.
+    """
+    
+    def __init__(self, server, character):
+        self.server = server
+        self.character = character
+        self._payloads = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+    
+    def profile_url(self, endpoint=""):
+        """Build Blizzard profile URL for this character (endpoint '' = summary)"""
+        character_processed = process_character_name(self.character)
+        url = f"https://{REGION}.api.blizzard.com/profile/wow/character/{self.server.lower()}/{quote(character_processed)}"
+        return f"{url}/{endpoint}" if endpoint else url
+    
+    def get_profile(self, endpoint=""):
+        """Get parsed profile payload, fetching it only on first use"""
+        with self._lock:
+            if endpoint in self._payloads:
+                return self._payloads[endpoint]
+            endpoint_lock = self._locks.setdefault(endpoint, threading.Lock())
+        
+        with endpoint_lock:
+            if endpoint in self._payloads:
+                return self._payloads[endpoint]
+            
+            token = token_manager.get_token()
+            if not token:
+                return None
+            
+            headers = {"Authorization": f"Bearer {token}"}
+            params = {"namespace": NAMESPACE, "locale": "ko_KR"}
+            
+            resp = safe_request("GET", self.profile_url(endpoint), headers=headers, params=params)
+            if not resp:
+                return None
+            
+            try:
+                data = resp.json()
+            except ValueError as e:
+                console.print(f"[warning]⚠ Failed to parse {endpoint or 'profile'} payload: {e}[/warning]")
+                return None
+            
+            with self._lock:
+                self._payloads[endpoint] = data
+            return data
+
+    def has_payload(self, endpoint=""):
+        """Whether this endpoint was fetched successfully"""
+        with self._lock:
+            return endpoint in self._payloads
+    
+    def fetch_summary(self, last_modified=None):
+        """Conditional GET of the character summary
+
+        Returns (status_code, payload, Last-Modified header); status_code is None on failure.
+        A 304 means nothing changed since last_modified.
+        """
+        token = token_manager.get_token()
+        if not token:
+            return None, None, None
+        
+        headers = {"Authorization": f"Bearer {token}"}
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        params = {"namespace": NAMESPACE, "locale": "ko_KR"}
+        
+        resp = safe_request("GET", self.profile_url(), headers=headers, params=params)
+        if not resp:
+            return None, None, None
+        if resp.status_code == 304:
+            return 304, None, last_modified
+        
+        try:
+            data = resp.json()
+        except ValueError:
+            return None, None, None
+        with self._lock:
+            self._payloads[""] = data
+        return resp.status_code, data, resp.headers.get("Last-Modified")
+
+def get_character_spec(server, character, ctx=None):
     """Get character's active specialization with icon"""
     token = token_manager.get_token()
     if not token:
         return "Unknown", ""
     
-    character_processed = process_character_name(character)
-    url = f"https://{REGION}.api.blizzard.com/profile/wow/character/{server.lower()}/{quote(character_processed)}/specializations"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"namespace": NAMESPACE, "locale": "ko_KR"}
-    
-    resp = safe_request("GET", url, headers=headers, params=params)
-    if not resp:
+    ctx = ctx or CharacterFetchContext(server, character)
+    data = ctx.get_profile("specializations")
+    if not data:
         return "Unknown", ""
     
     try:
-        data = resp.json()
         specializations = data.get("specializations", [])
         
         # Find active spec
@@ -284,142 +406,121 @@ def get_character_spec(server, character):
 
 def get_item_icon(item_id, token):
     """Get item icon URL from Blizzard media API"""
-    if not item_id or not token:
-        return ""
-    
-    url = f"https://{REGION}.api.blizzard.com/data/wow/media/item/{item_id}"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"namespace": "static-kr", "locale": "ko_KR"}
-    
-    resp = safe_request("GET", url, headers=headers, params=params)
-    if not resp:
-        return ""
+    return get_media_icon("item", "item", item_id, token)
+
+def parse_equipment(data, token, icons=None):
+    """Build equipment rows (with icons and upgrade tracks) from an equipment payload
+
+    icons: optional {item_id: icon_url} already fetched by the caller
+    """
+    equipped = data.get("equipped_items", [])
+    
+    equipment_list = []
+    for item in equipped:
+        slot_name = item.get("slot", {}).get("name", "Unknown")
+        item_name = item.get("name", "Unknown")
+        item_level = item.get("level", {}).get("value", 0)
+        item_id = item.get("item", {}).get("id", 0)
+        
+        # Get icon URL from Blizzard media API
+        icon_url = icons.get(item_id, "") if icons is not None else get_item_icon(item_id, token)
+        
+        # Try to get upgrade info from API bonus_list or context
+        upgrade_text = "Unknown"
+        
+        # Check if item has quality info (for determining track)
+        quality = item.get("quality", {}).get("type", "")
+        
+        # Get bonus_list which contains upgrade level info
+        bonus_list = item.get("bonus_list", [])
+        
+        # Detect upgrade track from ilvl (fallback method)
+        upgrade_info = detect_upgrade_track(item_level)
+        if upgrade_info:
+            track, current, maximum = upgrade_info
+            upgrade_text = f"{track} {current+1}/{maximum}"
+        else:
+            # If we can't detect from ilvl, use quality/context hints
+            if item_level >= 730:
+                upgrade_text = "Max"
+            else:
+                upgrade_text = format_upgrade_info(item_level)
+        
+        equipment_list.append({
+            "slot": slot_name,
+            "name": item_name,
+            "ilvl": item_level,
+            "item_id": item_id,
+            "icon": icon_url,
+            "upgrade": upgrade_text,
+            "bonus_list": bonus_list  # Store for debugging
+        })
+    
+    return equipment_list
+
+def parse_average_ilvl(data):
+    """Average equipped ilvl from an equipment payload"""
+    equipped = data.get("equipped_items", [])
+    if not equipped:
+        return 0
     
-    try:
-        data = resp.json()
-        assets = data.get("assets", [])
-        for asset in assets:
-            if asset.get("key") == "icon":
-                return asset.get("value", "")
-    except:
-        pass
+    # Filter out cosmetic slots
+    ilvls = []
+    for item in equipped:
+        slot_name = item.get("slot", {}).get("name", "")
+        if slot_name not in ["속옷", "겉옷"]:  # Exclude shirt/tabard
+            ilvls.append(item["level"]["value"])
     
-    return ""
+    return round(sum(ilvls) / len(ilvls), 1) if ilvls else 0
 
-def get_character_equipment(server, character):
+def get_character_equipment(server, character, ctx=None, icons=None):
     """Get detailed equipment list from Blizzard API with item icons and upgrade tracking"""
     token = token_manager.get_token()
     if not token:
         return []
     
-    character_processed = process_character_name(character)
-    url = f"https://{REGION}.api.blizzard.com/profile/wow/character/{server.lower()}/{quote(character_processed)}/equipment"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"namespace": NAMESPACE, "locale": "ko_KR"}
-    
-    resp = safe_request("GET", url, headers=headers, params=params)
-    if not resp:
+    ctx = ctx or CharacterFetchContext(server, character)
+    data = ctx.get_profile("equipment")
+    if not data:
         return []
     
     try:
-        data = resp.json()
-        equipped = data.get("equipped_items", [])
-        
-        equipment_list = []
-        for item in equipped:
-            slot_name = item.get("slot", {}).get("name", "Unknown")
-            item_name = item.get("name", "Unknown")
-            item_level = item.get("level", {}).get("value", 0)
-            item_id = item.get("item", {}).get("id", 0)
-            
-            # Get icon URL from Blizzard media API
-            icon_url = get_item_icon(item_id, token)
-            
-            # Try to get upgrade info from API bonus_list or context
-            upgrade_text = "Unknown"
-            
-            # Check if item has quality info (for determining track)
-            quality = item.get("quality", {}).get("type", "")
-            
-            # Get bonus_list which contains upgrade level info
-            bonus_list = item.get("bonus_list", [])
-            
-            # Detect upgrade track from ilvl (fallback method)
-            upgrade_info = detect_upgrade_track(item_level)
-            if upgrade_info:
-                track, current, maximum = upgrade_info
-                upgrade_text = f"{track} {current+1}/{maximum}"
-            else:
-                # If we can't detect from ilvl, use quality/context hints
-                if item_level >= 730:
-                    upgrade_text = "Max"
-                else:
-                    upgrade_text = format_upgrade_info(item_level)
-            
-            equipment_list.append({
-                "slot": slot_name,
-                "name": item_name,
-                "ilvl": item_level,
-                "item_id": item_id,
-                "icon": icon_url,
-                "upgrade": upgrade_text,
-                "bonus_list": bonus_list  # Store for debugging
-            })
-        
-        return equipment_list
+        return parse_equipment(data, token, icons)
     except (KeyError, ValueError, TypeError) as e:
         console.print(f"[warning]⚠ Failed to parse equipment: {e}[/warning]")
         return []
 
-def get_ilvl_from_blizzard(server, character):
+def get_ilvl_from_blizzard(server, character, ctx=None):
     """Get character average ilvl from Blizzard API"""
-    token = token_manager.get_token()
-    if not token:
-        return 0
-    
-    character_processed = process_character_name(character)
-    url = f"https://{REGION}.api.blizzard.com/profile/wow/character/{server.lower()}/{quote(character_processed)}/equipment"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"namespace": NAMESPACE, "locale": "ko_KR"}
-    
-    resp = safe_request("GET", url, headers=headers, params=params)
-    if not resp:
+    ctx = ctx or CharacterFetchContext(server, character)
+    data = ctx.get_profile("equipment")
+    if not data:
         return 0
     
     try:
-        data = resp.json()
-        equipped = data.get("equipped_items", [])
-        if not equipped:
-            return 0
-        
-        # Filter out cosmetic slots
-        ilvls = []
-        for item in equipped:
-            slot_name = item.get("slot", {}).get("name", "")
-            if slot_name not in ["속옷", "겉옷"]:  # Exclude shirt/tabard
-                ilvls.append(item["level"]["value"])
-        
-        return round(sum(ilvls) / len(ilvls), 1) if ilvls else 0
+        return parse_average_ilvl(data)
     except (KeyError, ValueError, TypeError) as e:
         console.print(f"[warning]⚠ Failed to parse ilvl: {e}[/warning]")
         return 0
 
 def get_mplus_score(server, character):
     """Get Mythic+ score from Raider.IO"""
-    url = "https://raider.io/api/v1/characters/profile"
-    params = {
-        "region": REGION,
-        "realm": server,
-        "name": character,
-        "fields": "mythic_plus_scores_by_season:current"
-    }
-    
-    resp = safe_request("GET", url, params=params)
-    if not resp:
+    score = fetch_mplus_score(server, character)
+    return "N/A" if score is None else score
+
+def fetch_mplus_score(server, character):
+    """Get Mythic+ score from Raider.IO; None if the request failed, "N/A" if no score"""
+    # One profile fetch per run, shared with mplus_enhanced via the run cache
+    try:
+        data = raiderio_profiles.get_profile(
+            server, character, lambda url, params: safe_request("GET", url, params=params)
+        )
+    except ValueError:
         return "N/A"
+    if data is None:
+        return None
     
     try:
-        data = resp.json()
         seasons = data.get("mythic_plus_scores_by_season", [])
         
         # Try current season
@@ -465,8 +566,7 @@ def get_wcl_data(server, character, role):
     
     payload = {"query": query, "variables": variables}
     
-    resp = safe_request("POST", "https://www.warcraftlogs.com/api/v2/client",
-                       headers=headers, json=payload)
+    resp = safe_request("POST", WCL_API_URL, headers=headers, json=payload)
     if not resp:
         return None
     
@@ -494,6 +594,135 @@ def get_wcl_data(server, character, role):
         console.print(f"[warning]⚠ WCL parse error: {e}[/warning]")
         return None
 
+def wcl_key(server, character):
+    """Lookup key for batched WCL results"""
+    return (server.strip().lower(), character.strip())
+
+class WclBatcher:
+    """Packs many characters into one aliased WCL GraphQL query.
+
+    Each character becomes a `cN: character(...)` field with its own
+    mythic/heroic zoneRankings; results are split back per character with
+    the same semantics as get_wcl_data (None = API error, {} = no logs).
+    Batch size is capped by the remaining hourly point budget reported in
+    rateLimitData.
+    """
+    
+    def __init__(self, batch_size=WCL_BATCH_SIZE, points_per_character=WCL_POINTS_PER_CHARACTER):
+        self.batch_size = max(1, batch_size)
+        self.points_per_character = points_per_character
+        self.points_remaining = None
+        self.requests_sent = 0
+    
+    def next_batch_size(self):
+        """Largest batch the remaining point budget allows"""
+        if self.points_remaining is None or self.points_per_character <= 0:
+            return self.batch_size
+        affordable = int(self.points_remaining // self.points_per_character)
+        return max(1, min(self.batch_size, affordable))
+    
+    @staticmethod
+    def build_query(count):
+        """GraphQL document with `count` aliased character fields"""
+        params = ["$region: String!"]
+        fields = []
+        for i in range(count):
+            params.append(f"$name{i}: String!, $server{i}: String!, $metric{i}: CharacterRankingMetricType!")
+            fields.append(f"""
+        c{i}: character(name: $name{i}, serverSlug: $server{i}, serverRegion: $region) {{
+          name
+          mythicRankings: zoneRankings(metric: $metric{i}, difficulty: 5)
+          heroicRankings: zoneRankings(metric: $metric{i}, difficulty: 4)
+        }}""")
+        return f"""
+    query({", ".join(params)}) {{
+      rateLimitData {{
+        limitPerHour
+        pointsSpentThisHour
+      }}
+      characterData {{{"".join(fields)}
+      }}
+    }}
+    """
+    
+    def fetch_batch(self, entries):
+        """Fetch one batch of (server, character, role); returns list of results"""
+        variables = {"region": REGION}
+        for i, (server, character, role) in enumerate(entries):
+            variables[f"name{i}"] = character
+            variables[f"server{i}"] = server.lower()
+            variables[f"metric{i}"] = "hps" if role.lower() == "healer" else "dps"
+        
+        headers = {
+            "Authorization": f"Bearer {WCL_ACCESS_TOKEN}",
+            "Content-Type": "application/json"
+        }
+        payload = {"query": self.build_query(len(entries)), "variables": variables}
+        
+        self.requests_sent += 1
+        resp = safe_request("POST", WCL_API_URL, headers=headers, json=payload)
+        if not resp:
+            return [None] * len(entries)
+        
+        try:
+            data = resp.json()
+        except ValueError as e:
+            console.print(f"[warning]⚠ WCL parse error: {e}[/warning]")
+            return [None] * len(entries)
+        
+        body = data.get('data') or {}
+        
+        rate = body.get('rateLimitData') or {}
+        if rate.get('limitPerHour') is not None:
+            self.points_remaining = rate['limitPerHour'] - rate.get('pointsSpentThisHour', 0)
+        
+        # GraphQL errors are attributed to a character through their path (['characterData', 'cN', ...])
+        failed = set()
+        for error in data.get('errors') or []:
+            path = error.get('path') or []
+            if len(path) >= 2 and path[0] == 'characterData':
+                failed.add(path[1])
+            else:
+                console.print(f"[warning]⚠ WCL error: {error.get('message', 'Unknown')}[/warning]")
+                return [None] * len(entries)
+        
+        character_data = body.get('characterData') or {}
+        results = []
+        for i, (server, character, role) in enumerate(entries):
+            alias = f"c{i}"
+            if alias in failed:
+                results.append(None)
+                continue
+            character_info = character_data.get(alias)
+            if not character_info:
+                console.print(f"[warning]⚠ {character}@{server} not found in WCL (no logs)[/warning]")
+                results.append({})
+                continue
+            results.append({
+                'mythic': character_info.get('mythicRankings', {}),
+                'heroic': character_info.get('heroicRankings', {})
+            })
+        return results
+    
+    def fetch_all(self, entries):
+        """Fetch WCL data for all (server, character, role) entries in batches"""
+        results = {}
+        pending = list(entries)
+        while pending:
+            size = self.next_batch_size()
+            batch, pending = pending[:size], pending[size:]
+            for (server, character, role), result in zip(batch, self.fetch_batch(batch)):
+                results[wcl_key(server, character)] = result
+        return results
+
+def prefetch_wcl_data(characters):
+    """Batch-fetch WCL data for every roster row; {wcl_key: result}"""
+    entries = [(row["Server"].strip(), row["ID"].strip(), row["Role"].strip()) for row in characters]
+    batcher = WclBatcher()
+    results = batcher.fetch_all(entries)
+    console.print(f"[info]📦 WCL: {len(entries)} characters in {batcher.requests_sent} batched requests[/info]")
+    return results
+
 # ────────────────────────────────────────────────
 # Formatting Functions
 
@@ -642,81 +871,377 @@ def format_comprehensive_report(character, character_class, role, server, wcl_sp
 # ────────────────────────────────────────────────
 # Worker Function
 
-def crawl_character(row, attempt=1):
-    """Crawl all data for a single character"""
+def build_character_result(row, equipment_data, ilvl, mplus_score, wcl_data, blizzard_spec, blizzard_spec_icon):
+    """Write the detailed report for fetched character data; returns (CSV row, structured record)"""
     server = row["Server"].strip()
     character = row["ID"].strip()
     role = row["Role"].strip()
     character_class = row["Class"].strip()
     
-    console.print(f"[info]▶ Fetching {character}... (Attempt {attempt})[/info]")
+    # Handle WCL data
+    if wcl_data is None:
+        # Complete API failure
+        with open(FAILED_LOG, "a", encoding="utf-8") as f:
+            f.write(f"{datetime.now().isoformat()} - {character} - WCL API error\n")
+        console.print(f"[error]❌ {character} - WCL API failed[/error]")
+        wcl_data = {}  # Use empty dict for report generation
     
-    try:
-        # Collect all data
-        equipment_data = get_character_equipment(server, character)
-        ilvl = get_ilvl_from_blizzard(server, character)
-        mplus_score = get_mplus_score(server, character)
-        wcl_data = get_wcl_data(server, character, role)
-        
-        # Get spec with icon from Blizzard API
-        blizzard_spec, blizzard_spec_icon = get_character_spec(server, character)
-        
-        # Retry logic for failures
-        if (wcl_data is None or ilvl == 0) and attempt < 3:
-            console.print(f"[warning]⚠ Retrying {character}...[/warning]")
-            time.sleep(2)
-            return crawl_character(row, attempt + 1)
-        
-        # Handle WCL data
-        if wcl_data is None:
-            # Complete API failure
-            with open(FAILED_LOG, "a", encoding="utf-8") as f:
-                f.write(f"{datetime.now().isoformat()} - {character} - WCL API error\n")
-            console.print(f"[error]❌ {character} - WCL API failed[/error]")
-            wcl_data = {}  # Use empty dict for report generation
-        
-        # Extract spec from WCL or use Blizzard spec
-        # Try to get from mythic first, then heroic, then fallback to Blizzard
-        mythic_data = wcl_data.get('mythic', {}) if isinstance(wcl_data, dict) else wcl_data
-        heroic_data = wcl_data.get('heroic', {}) if isinstance(wcl_data, dict) else {}
-        
-        all_stars = mythic_data.get('allStars', []) if mythic_data else []
-        if not all_stars and heroic_data:
-            all_stars = heroic_data.get('allStars', [])
-        
-        wcl_spec = all_stars[0].get('spec', blizzard_spec) if all_stars else blizzard_spec
-        wcl_spec_icon = blizzard_spec_icon  # Use Blizzard icon
-        
-        # Use mythic performance for CSV, fallback to heroic
-        best_perf_avg = mythic_data.get('bestPerformanceAverage', "N/A") if mythic_data else "N/A"
-        if best_perf_avg == "N/A" and heroic_data:
-            best_perf_avg = heroic_data.get('bestPerformanceAverage', "N/A")
-        
-        # Save comprehensive report
-        os.makedirs(DETAIL_DIR, exist_ok=True)
-        report_content = format_comprehensive_report(
-            character, character_class, role, server, wcl_spec, wcl_spec_icon,
-            equipment_data, ilvl, mplus_score, wcl_data
+    # Extract spec from WCL or use Blizzard spec
+    # Try to get from mythic first, then heroic, then fallback to Blizzard
+    mythic_data = wcl_data.get('mythic', {}) if isinstance(wcl_data, dict) else wcl_data
+    heroic_data = wcl_data.get('heroic', {}) if isinstance(wcl_data, dict) else {}
+    
+    all_stars = mythic_data.get('allStars', []) if mythic_data else []
+    if not all_stars and heroic_data:
+        all_stars = heroic_data.get('allStars', [])
+    
+    wcl_spec = all_stars[0].get('spec', blizzard_spec) if all_stars else blizzard_spec
+    wcl_spec_icon = blizzard_spec_icon  # Use Blizzard icon
+    
+    # Use mythic performance for CSV, fallback to heroic
+    best_perf_avg = mythic_data.get('bestPerformanceAverage', "N/A") if mythic_data else "N/A"
+    if best_perf_avg == "N/A" and heroic_data:
+        best_perf_avg = heroic_data.get('bestPerformanceAverage', "N/A")
+    
+    # Save comprehensive report
+    os.makedirs(DETAIL_DIR, exist_ok=True)
+    report_content = format_comprehensive_report(
+        character, character_class, role, server, wcl_spec, wcl_spec_icon,
+        equipment_data, ilvl, mplus_score, wcl_data
+    )
+    with open(os.path.join(DETAIL_DIR, f"{character}.md"), "w", encoding="utf-8") as f:
+        f.write(report_content)
+    
+    console.print(f"[success]✔ {character} complete! ({wcl_spec}, ilvl {ilvl})[/success]")
+    
+    record = build_record(character, character_class, role, server, wcl_spec, wcl_spec_icon,
+                          equipment_data, ilvl, mplus_score, wcl_data)
+    return [
+        character,
+        character_class,
+        wcl_spec,
+        ilvl,
+        format_amount(mplus_score),
+        format_amount(best_perf_avg) if best_perf_avg != "N/A" else "N/A"
+    ], record
+
+def build_failure_result(row, error):
+    """Log an unexpected crawl error and return the placeholder CSV row"""
+    character = row["ID"].strip()
+    character_class = row["Class"].strip()
+    
+    console.print(f"[error]❌ Unexpected error for {character}: {error}[/error]")
+    with open(FAILED_LOG, "a", encoding="utf-8") as f:
+        f.write(f"{datetime.now().isoformat()} - {character} - Error: {str(error)}\n")
+    return [character, character_class, "N/A", 0, "N/A", "N/A"]
+
+def retry_delay(attempt):
+    """Jittered exponential backoff before retry number `attempt`"""
+    return RETRY_BASE_DELAY * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+class CharacterCrawl:
+    """Fetched data and retry bookkeeping for one character.
+
+    The crawl is split into independent parts (equipment, spec, rio, wcl).
+    Each attempt only fetches the parts that are still missing, so a WCL
+    hiccup no longer re-fetches equipment, spec and Raider.IO data.
+    """
+    
+    def __init__(self, row, wcl_prefetch=None):
+        self.row = row
+        self.server = row["Server"].strip()
+        self.character = row["ID"].strip()
+        self.role = row["Role"].strip()
+        self.ctx = CharacterFetchContext(self.server, self.character)
+        self.wcl_prefetch = wcl_prefetch
+        self.data = {}
+        self.failed = set(CRAWL_PARTS)
+        self.attempts = 0
+        self.error = None
+        self.record = None
+        self._lock = threading.Lock()
+    
+    def begin_attempt(self):
+        """Count a new attempt; returns the parts it has to fetch"""
+        with self._lock:
+            self.attempts += 1
+            parts = sorted(self.failed)
+        console.print(f"[info]▶ Fetching {self.character}... (Attempt {self.attempts})[/info]")
+        return parts
+    
+    def fetch_part(self, part, icons=None):
+        """Fetch one part and record whether it succeeded"""
+        server, character = self.server, self.character
+        
+        if part == "equipment":
+            equipment_data = get_character_equipment(server, character, self.ctx, icons)
+            ilvl = get_ilvl_from_blizzard(server, character, self.ctx)
+            value, ok = (equipment_data, ilvl), ilvl != 0
+        elif part == "spec":
+            value = get_character_spec(server, character, self.ctx)
+            ok = self.ctx.has_payload("specializations")
+        elif part == "rio":
+            score = fetch_mplus_score(server, character)
+            value, ok = ("N/A" if score is None else score), score is not None
+        elif part == "wcl":
+            value = None
+            if self.attempts == 1 and self.wcl_prefetch:
+                value = self.wcl_prefetch.get(wcl_key(server, character))
+            if value is None:
+                value = get_wcl_data(server, character, self.role)
+            ok = value is not None
+        else:
+            raise ValueError(f"Unknown crawl part: {part}")
+        
+        with self._lock:
+            self.data[part] = value
+            if ok:
+                self.failed.discard(part)
+    
+    @property
+    def complete(self):
+        """Whether every part was fetched (checkpointed as done for --resume)"""
+        with self._lock:
+            return not self.failed and self.error is None
+    
+    def needs_retry(self):
+        with self._lock:
+            return bool(self.failed) and self.attempts < MAX_CRAWL_ATTEMPTS
+    
+    def step(self):
+        """Run one attempt; returns the CSV row when done, None if a retry is needed"""
+        try:
+            for part in self.begin_attempt():
+                self.fetch_part(part)
+            
+            if self.needs_retry():
+                console.print(f"[warning]⚠ Retrying {self.character} ({', '.join(sorted(self.failed))})...[/warning]")
+                return None
+            return self.finish()
+        except Exception as e:
+            self.error = e
+            return build_failure_result(self.row, e)
+    
+    def finish(self):
+        """Write the report from whatever was fetched and return the CSV row"""
+        equipment_data, ilvl = self.data.get("equipment", ([], 0))
+        blizzard_spec, blizzard_spec_icon = self.data.get("spec", ("Unknown", ""))
+        result, self.record = build_character_result(self.row, equipment_data, ilvl, self.data.get("rio", "N/A"),
+                                                     self.data.get("wcl"), blizzard_spec, blizzard_spec_icon)
+        return result
+
+def crawl_character(row, wcl_prefetch=None):
+    """Crawl all data for a single character (standalone, outside the scheduler)"""
+    crawl = CharacterCrawl(row, wcl_prefetch)
+    while True:
+        result = crawl.step()
+        if result is not None:
+            return result
+        time.sleep(retry_delay(crawl.attempts))
+
+class CrawlScheduler:
+    """Runs character crawls on a worker pool with a separate retry queue.
+
+    A character with failed parts is parked in a time-ordered retry queue
+    (jittered backoff) instead of sleeping inside its worker, so healthy
+    characters keep the pool busy while a flaky profile waits its turn.
+    """
+    
+    def __init__(self, max_workers=5):
+        self.max_workers = max_workers
+    
+    def run(self, characters, wcl_prefetch=None, on_result=None):
+        """Crawl every character; returns rows in input order.
+
+        on_result(row, complete, record) is called as each character finishes.
+        """
+        crawls = [CharacterCrawl(row, wcl_prefetch) for row in characters]
+        results = [None] * len(crawls)
+        retry_queue = []  # heap of (due_time, index)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {executor.submit(crawl.step): i for i, crawl in enumerate(crawls)}
+            
+            while running or retry_queue:
+                # Submit retries that are due
+                now = time.monotonic()
+                while retry_queue and retry_queue[0][0] <= now:
+                    _, i = heapq.heappop(retry_queue)
+                    running[executor.submit(crawls[i].step)] = i
+                
+                if not running:
+                    time.sleep(max(0, retry_queue[0][0] - time.monotonic()))
+                    continue
+                
+                timeout = max(0, retry_queue[0][0] - time.monotonic()) if retry_queue else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    i = running.pop(future)
+                    result = future.result()
+                    if result is None:
+                        heapq.heappush(retry_queue, (time.monotonic() + retry_delay(crawls[i].attempts), i))
+                        continue
+                    results[i] = result
+                    if on_result:
+                        on_result(result, crawls[i].complete, crawls[i].record)
+        
+        return results
+
+# ────────────────────────────────────────────────
+# Incremental Crawl State
+
+class CrawlState:
+    """Per-character validators (Last-Modified / last login) and last CSV row.
+
+    Used by --incremental: a character whose profile is unchanged since the
+    previous crawl reuses its stored row and detailed/{name}.md instead of
+    re-fetching equipment, spec, Raider.IO and WCL data.
+    """
+    
+    def __init__(self, path=CRAWL_STATE_FILE, max_age_hours=INCREMENTAL_MAX_AGE_HOURS):
+        self.path = path
+        self.max_age = max_age_hours * 60 * 60
+        self.entries = {}
+        self.pending = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, path=CRAWL_STATE_FILE):
+        state = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                console.print(f"[warning]⚠ Ignoring unreadable crawl state: {e}[/warning]")
+        return state
+    
+    def save(self):
+        """Write state atomically"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+    
+    def check(self, row):
+        """Return the stored CSV row if the character is unchanged, else None"""
+        server = row["Server"].strip()
+        character = row["ID"].strip()
+        entry = self.entries.get(character) or {}
+        
+        ctx = CharacterFetchContext(server, character)
+        status, data, last_modified = ctx.fetch_summary(entry.get("last_modified"))
+        if status is None:
+            return None
+        
+        validators = {
+            "last_modified": last_modified or entry.get("last_modified"),
+            "last_login": data.get("last_login_timestamp") if data else entry.get("last_login")
+        }
+        
+        reusable = (
+            entry.get("row")
+            and time.time() - entry.get("crawled_at", 0) < self.max_age
+            and os.path.exists(os.path.join(DETAIL_DIR, f"{character}.md"))
         )
-        with open(os.path.join(DETAIL_DIR, f"{character}.md"), "w", encoding="utf-8") as f:
-            f.write(report_content)
-        
-        console.print(f"[success]✔ {character} complete! ({wcl_spec}, ilvl {ilvl})[/success]")
-        
-        return [
-            character,
-            character_class,
-            wcl_spec,
-            ilvl,
-            format_amount(mplus_score),
-            format_amount(best_perf_avg) if best_perf_avg != "N/A" else "N/A"
-        ]
-        
-    except Exception as e:
-        console.print(f"[error]❌ Unexpected error for {character}: {e}[/error]")
-        with open(FAILED_LOG, "a", encoding="utf-8") as f:
-            f.write(f"{datetime.now().isoformat()} - {character} - Error: {str(e)}\n")
-        return [character, character_class, "N/A", 0, "N/A", "N/A"]
+        unchanged = status == 304 or (
+            validators["last_login"] is not None and validators["last_login"] == entry.get("last_login")
+        )
+        if reusable and unchanged:
+            return entry["row"]
+        
+        with self._lock:
+            self.pending[character] = validators
+        return None
+    
+    def record(self, result):
+        """Store validators + row for a successfully crawled character"""
+        character = result[0]
+        with self._lock:
+            validators = self.pending.pop(character, None)
+            if validators is None or not result[3]:  # No validators, or crawl failed (ilvl 0)
+                return
+            self.entries[character] = dict(validators, row=result, crawled_at=time.time())
+
+def find_unchanged(characters, state):
+    """Check every character's validators concurrently; {name: stored row}"""
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        rows = list(executor.map(state.check, characters))
+    return {char["ID"].strip(): row for char, row in zip(characters, rows) if row}
+
+# ────────────────────────────────────────────────
+# Result Journal
+class ResultJournal:
+    """Append-only JSONL log of finished CSV rows.
+
+    Each row is flushed and fsynced as soon as its character completes, so a
+    crash mid-run keeps everything crawled so far. Player_data.csv is then
+    built from the journal in roster order. Entries also record whether the
+    character was fully crawled, which makes the journal the checkpoint for
+    --resume.
+    """
+    
+    def __init__(self, path=CRAWL_JOURNAL_FILE):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+    
+    def open(self, resume=False):
+        """Start a fresh journal, or keep appending to the last one when resuming"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+    
+    def append(self, result, complete=True, record=None):
+        """Durably record one finished row (and its structured record, if any)"""
+        line = json.dumps({"id": result[0], "row": result, "complete": complete, "record": record}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def _entries(self):
+        """Latest entry per character; {name: entry}"""
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash
+                entries[entry["id"]] = entry
+        return entries
+    
+    def load(self):
+        """Rows recorded so far; {name: row}, later entries win"""
+        return {name: entry["row"] for name, entry in self._entries().items()}
+    
+    def records(self):
+        """Structured records recorded so far; {name: record}"""
+        return {name: entry["record"] for name, entry in self._entries().items() if entry.get("record")}
+    
+    def completed(self):
+        """Rows of characters that were fully crawled; {name: row}"""
+        return {name: entry["row"] for name, entry in self._entries().items() if entry.get("complete", True)}
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def write_results_csv(path, results):
+    """Write Player_data.csv atomically (readers never see a partial file)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Class", "Spec", "ilvl", "M+", "WCL"])
+        writer.writerows(results)
+    os.replace(tmp_path, path)
 
 # ────────────────────────────────────────────────
 # Comparison Functions
@@ -832,18 +1357,34 @@ def print_console_summary(results):
 # ────────────────────────────────────────────────
 # Main Function
 
-def main():
+def parse_args(argv=None):
+    """Parse crawler command line options"""
+    parser = argparse.ArgumentParser(description="WoW guild character crawler")
+    parser.add_argument("--engine", choices=["threads", "async"], default=os.getenv("CRAWL_ENGINE", "threads"),
+                        help="crawl engine: fixed thread pool (default) or asyncio fan-out")
+    parser.add_argument("--incremental", action="store_true", default=os.getenv("CRAWL_INCREMENTAL", "") == "1",
+                        help="skip characters whose Blizzard profile is unchanged since the last crawl")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted crawl: only crawl characters missing or failed in the last run")
+    return parser.parse_args(argv if argv is not None else [])
+
+def main(argv=None):
     """Main execution"""
+    args = parse_args(argv)
     start_time = time.time()
     
     # Setup
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     os.makedirs(DETAIL_DIR, exist_ok=True)
     
-    # Clear failed log
-    if os.path.exists(FAILED_LOG):
+    # Clear failed log (kept when resuming, it still describes the earlier failures)
+    if os.path.exists(FAILED_LOG) and not args.resume:
         os.remove(FAILED_LOG)
     
+    # A new run starts with an empty Raider.IO run cache
+    if not args.resume:
+        raiderio_profiles.reset()
+    
     # Load characters
     if not os.path.exists(INPUT_FILE):
         console.print(f"[error]❌ Input file not found: {INPUT_FILE}[/error]")
@@ -857,7 +1398,32 @@ def main():
     console.print(f"[bold cyan]🎮 Fetching data for {roster_num} players...[/bold cyan]\n")
     console.print(f"[bold green]✨ Upgrade tracking enabled! (Explorer → Myth tracks)[/bold green]\n")
     
-    results = []
+    journal = ResultJournal()
+    previous_records = load_crawl_results()  # Structured results of the last run
+    
+    # Resume mode: skip characters the last run already finished
+    resumed = {}
+    to_crawl = characters
+    if args.resume:
+        completed = journal.completed()
+        resumed = {char["ID"].strip(): completed[char["ID"].strip()] for char in characters if char["ID"].strip() in completed}
+        to_crawl = [char for char in characters if char["ID"].strip() not in resumed]
+        console.print(f"[info]⏯ Resuming: {len(resumed)} already done, {len(to_crawl)} missing or failed[/info]\n")
+    
+    # Incremental mode: reuse rows for unchanged characters
+    state = None
+    reused = {}
+    if args.incremental:
+        state = CrawlState.load()
+        console.print("[info]🔎 Checking for unchanged characters...[/info]")
+        reused = find_unchanged(to_crawl, state)
+        to_crawl = [char for char in to_crawl if char["ID"].strip() not in reused]
+        console.print(f"[info]⏭ {len(reused)} unchanged (reused), {len(to_crawl)} to crawl[/info]\n")
+    
+    # Every finished row goes to the journal as soon as it completes
+    journal.open(resume=args.resume)
+    for name, row in reused.items():
+        journal.append(row, True, previous_records.get(name))
     
     # Process with progress bar
     with Progress(
@@ -868,26 +1434,53 @@ def main():
         console=console
     ) as progress:
         task = progress.add_task("Processing...", total=roster_num)
+        progress.update(task, advance=len(resumed) + len(reused))
         
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(crawl_character, char) for char in characters]
-            
-            for future in futures:
-                result = future.result()
-                if result:
-                    results.append(result)
-                progress.update(task, advance=1)
+        def on_result(result, complete=True, record=None):
+            journal.append(result, complete, record)
+            progress.update(task, advance=1)
+        
+        try:
+            if args.engine == "async":
+                import async_crawler
+                async_crawler.crawl_all(to_crawl, on_result=on_result)
+            elif to_crawl:
+                wcl_prefetch = prefetch_wcl_data(to_crawl)
+                scheduler = CrawlScheduler(max_workers=5)
+                scheduler.run(to_crawl, wcl_prefetch, on_result=on_result)
+        finally:
+            journal.close()
+            raiderio_profiles.save()  # Reused by mplus_enhanced later in this run
+    
+    # Build the final CSV from the journal, in roster order
+    journal_rows = journal.load()
+    results = []
+    for char in characters:
+        name = char["ID"].strip()
+        result = journal_rows.get(name)
+        if result:
+            results.append(result)
+            if state and name not in reused:
+                state.record(result)
+    
+    if state:
+        state.save()
     
     # Save results
-    with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["ID", "Class", "Spec", "ilvl", "M+", "WCL"])
-        writer.writerows(results)
+    write_results_csv(OUTPUT_FILE, results)
+    
+    # Structured results for the dashboards (characters that failed keep their last record)
+    records = dict(previous_records, **journal.records())
+    write_crawl_results([records[char["ID"].strip()] for char in characters if char["ID"].strip() in records])
     
     elapsed = time.time() - start_time
     console.print(f"\n[success]✅ Crawling complete in {elapsed:.1f}s[/success]")
     console.print(f"[info]📁 Results saved to: {OUTPUT_FILE}[/info]")
     console.print(f"[info]📝 Detailed reports with upgrade tracking in: {DETAIL_DIR}/[/info]")
+    console.print(f"[info]🗂️ Structured results saved to: {CRAWL_RESULTS_FILE}[/info]")
+    
+    media_stats = media_cache.stats()
+    console.print(f"[info]🖼️ Media cache - hits: {media_stats['hits']} | misses: {media_stats['misses']} | hit rate: {media_stats['hit_rate']:.1f}%[/info]")
     
     # Print summary
     print_console_summary(results)
@@ -899,4 +1492,4 @@ def main():
     console.print("[info]💡 Check detailed/*.md files to see item upgrade levels (e.g., Myth 6/8)[/info]")
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])